@@ -0,0 +1,30 @@
+# Migration to add denormalized product_count field to Business model
+
+from django.db import migrations, models
+
+
+def backfill_product_counts(apps, schema_editor):
+    """Set product_count for existing businesses."""
+    Business = apps.get_model('accounts', 'Business')
+    for business in Business.objects.annotate(num_products=models.Count('products')):
+        Business.objects.filter(pk=business.pk).update(product_count=business.num_products)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_product_chroma_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='business',
+            name='product_count',
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text='Number of products owned by this business (kept in sync by signals)'
+            ),
+        ),
+        migrations.RunPython(backfill_product_counts, reverse_code=migrations.RunPython.noop),
+    ]
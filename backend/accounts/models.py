@@ -105,6 +105,11 @@ class UserHFTokenAssignment(models.Model):
     def __str__(self):
         status = 'Active' if self.is_active else 'Released'
         return f"{self.user.username} - {self.hf_token.name} - {status}"
+    
+    @staticmethod
+    def token_cache_key(user_id):
+        """Cache key of a user's resolved HuggingFace API token (see HuggingFaceService)."""
+        return f'hf_token:{user_id}'
 # Re-export AuthToken from models_token
 from .models_token import AuthToken
 from .models_business import Business
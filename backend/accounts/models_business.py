@@ -50,6 +50,11 @@ class Business(models.Model):
         db_index=True,
         help_text='Unique ID for ChromaDB document'
     )
+    product_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Number of products owned by this business (kept in sync by signals)'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -73,4 +78,11 @@ class Business(models.Model):
     
     def save(self, *args, **kwargs):
         self.full_clean()
+        if not self._state.adding and not args and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            # product_count is maintained with F() updates by accounts.signals;
+            # writing back the in-memory value would undo concurrent product changes
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'product_count'
+            ]
         super().save(*args, **kwargs)
@@ -52,7 +52,7 @@ class Product(models.Model):
         
         # Validate max 10 products per business
         if not self.pk:  # Only check on creation
-            existing_products_count = Product.objects.filter(business=self.business).count()
+            existing_products_count = self.business.product_count
             if existing_products_count >= 10:
                 raise ValidationError({
                     'business': f'Maximum 10 products allowed per business. You already have {existing_products_count} products.'
@@ -73,6 +73,11 @@ class Product(models.Model):
     def get_images_count(self):
         """Get count of images for this product."""
         return self.images.count()
+    
+    @staticmethod
+    def data_cache_key(product_id):
+        """Cache key of a product's serialized data shown in chat (see HuggingFaceService)."""
+        return f'product_data:{product_id}'
 
 
 class ProductImage(models.Model):
@@ -74,7 +74,7 @@ class BusinessSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         """Create business with logo and ChromaDB integration."""
-        from chat.chroma_service import chroma_service
+        from chat.tasks import chroma_upsert_business
         import uuid
         
         logo_data = validated_data.pop('logo_upload', None)
@@ -101,8 +101,8 @@ class BusinessSerializer(serializers.ModelSerializer):
         # Create business
         business = Business.objects.create(**validated_data)
         
-        # Add to ChromaDB
-        chroma_service.add_business(
+        # Add to ChromaDB in the background once the row is committed
+        chroma_upsert_business(
             business_id=chroma_id,
             business_info=business.business_info,
             username=user.username
@@ -112,7 +112,7 @@ class BusinessSerializer(serializers.ModelSerializer):
     
     def update(self, instance, validated_data):
         """Update business with logo and ChromaDB integration."""
-        from chat.chroma_service import chroma_service
+        from chat.tasks import chroma_upsert_business
         
         logo_data = validated_data.pop('logo_upload', None)
         
@@ -133,8 +133,8 @@ class BusinessSerializer(serializers.ModelSerializer):
         # Update business info
         if 'business_info' in validated_data:
             instance.business_info = validated_data['business_info']
-            # Update in ChromaDB
-            chroma_service.add_business(
+            # Update in ChromaDB in the background
+            chroma_upsert_business(
                 business_id=instance.chroma_id,
                 business_info=instance.business_info,
                 username=instance.user.username
@@ -168,7 +168,7 @@ class ProductSerializer(serializers.ModelSerializer):
         if not self.instance:  # Only on creation
             business = attrs.get('business') or (self.context.get('request').user.business if self.context.get('request') else None)
             if business:
-                existing_products_count = Product.objects.filter(business=business).count()
+                existing_products_count = business.product_count
                 if existing_products_count >= 10:
                     raise serializers.ValidationError({
                         'business': f'Maximum 10 products allowed per business. You already have {existing_products_count} products.'
@@ -186,7 +186,7 @@ class ProductSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         """Create product with images and store description in ChromaDB."""
-        from chat.chroma_service import chroma_service
+        from chat.tasks import chroma_upsert_product
         
         images_data = validated_data.pop('images_upload', [])
         business = validated_data['business']
@@ -198,8 +198,8 @@ class ProductSerializer(serializers.ModelSerializer):
         # Create product in MySQL
         product = Product.objects.create(**validated_data)
         
-        # Store product description in ChromaDB
-        chroma_service.add_product(
+        # Store product description in ChromaDB in the background once the row is committed
+        chroma_upsert_product(
             product_id=chroma_id,
             product_description=product.product_description,
             business_id=business.id,
@@ -235,7 +235,7 @@ class ProductSerializer(serializers.ModelSerializer):
     
     def update(self, instance, validated_data):
         """Update product with images and update ChromaDB."""
-        from chat.chroma_service import chroma_service
+        from chat.tasks import chroma_upsert_product
         
         images_data = validated_data.pop('images_upload', None)
         
@@ -244,8 +244,8 @@ class ProductSerializer(serializers.ModelSerializer):
             instance.product_description = validated_data['product_description']
             instance.save()
             
-            # Update in ChromaDB
-            chroma_service.add_product(
+            # Update in ChromaDB in the background
+            chroma_upsert_product(
                 product_id=instance.chroma_id,
                 product_description=instance.product_description,
                 business_id=instance.business.id,
@@ -285,6 +285,50 @@ class ProductSerializer(serializers.ModelSerializer):
         return instance
 
 
+_datetime_field = serializers.DateTimeField()
+
+
+def product_image_to_dict(image):
+    """
+    Build the same dict as ProductImageSerializer(image).data without going
+    through DRF field by field (used on hot paths). image is a ProductImage or
+    a values() row of one.
+    """
+    if isinstance(image, dict):
+        get = image.__getitem__
+    else:
+        get = lambda name: getattr(image, name)
+    image_data = get('image_data')
+    return {
+        'id': get('id'),
+        'product': get('product_id'),
+        'image_base64': base64.b64encode(image_data).decode('utf-8') if image_data else None,
+        'image_filename': get('image_filename'),
+        'image_content_type': get('image_content_type'),
+        'order': get('order'),
+        'created_at': _datetime_field.to_representation(get('created_at')),
+    }
+
+
+def product_to_dict(product):
+    """
+    Build the same dict as ProductSerializer(product).data without going
+    through DRF field by field, for a product loaded with its business,
+    business owner and images.
+    """
+    images = [product_image_to_dict(image) for image in product.images.all()]
+    return {
+        'id': product.id,
+        'business': product.business_id,
+        'product_description': product.product_description,
+        'images': images,
+        'images_count': len(images),
+        'business_info': ProductSerializer().get_business_info(product),
+        'created_at': _datetime_field.to_representation(product.created_at),
+        'updated_at': _datetime_field.to_representation(product.updated_at),
+    }
+
+
 class ProductCreateUpdateSerializer(serializers.Serializer):
     """Simplified serializer for creating/updating products."""
     product_description = serializers.CharField(max_length=2000)
@@ -0,0 +1,61 @@
+"""
+Signal handlers for the accounts app.
+
+Cache invalidations here delete from Django's cache, so they reach every
+worker process only when CACHES is a shared backend (see settings).
+"""
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import HuggingFaceToken, UserHFTokenAssignment
+from .models_business import Business
+from .models_product import Product, ProductImage
+
+
+@receiver(post_save, sender=Product)
+def increment_business_product_count(sender, instance, created, **kwargs):
+    """Keep Business.product_count in sync when a product is created."""
+    if created:
+        Business.objects.filter(pk=instance.business_id).update(product_count=F('product_count') + 1)
+
+
+@receiver(post_delete, sender=Product)
+def decrement_business_product_count(sender, instance, **kwargs):
+    """Keep Business.product_count in sync when a product is deleted."""
+    Business.objects.filter(pk=instance.business_id, product_count__gt=0).update(product_count=F('product_count') - 1)
+
+
+@receiver(post_save, sender=UserHFTokenAssignment)
+@receiver(post_delete, sender=UserHFTokenAssignment)
+def invalidate_user_hf_token(sender, instance, **kwargs):
+    """Drop the cached HuggingFace token of a user whose assignment changed."""
+    cache.delete(UserHFTokenAssignment.token_cache_key(instance.user_id))
+
+
+@receiver(post_save, sender=HuggingFaceToken)
+def invalidate_assigned_hf_tokens(sender, instance, **kwargs):
+    """Drop the cached HuggingFace token of every user assigned a token that changed."""
+    user_ids = set(instance.assignments.values_list('user_id', flat=True))
+    cache.delete_many([UserHFTokenAssignment.token_cache_key(user_id) for user_id in user_ids])
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_data(sender, instance, **kwargs):
+    """Drop the cached serialized data of a product that changed."""
+    cache.delete(Product.data_cache_key(instance.pk))
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def invalidate_product_image_data(sender, instance, **kwargs):
+    """Drop the cached serialized data of a product whose images changed."""
+    cache.delete(Product.data_cache_key(instance.product_id))
+
+
+@receiver(post_save, sender=Business)
+def invalidate_business_products_data(sender, instance, **kwargs):
+    """Drop the cached serialized data of every product of a business that changed."""
+    product_ids = instance.products.values_list('pk', flat=True)
+    cache.delete_many([Product.data_cache_key(product_id) for product_id in product_ids])
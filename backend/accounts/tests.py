@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from .models_business import Business
+from .models_product import Product, ProductImage
+from .serializers_business import BusinessSerializer
+from .serializers_product import (
+    ProductImageSerializer,
+    ProductSerializer,
+    product_image_to_dict,
+    product_to_dict,
+)
+
+
+class BusinessProductCountTests(TestCase):
+    """Business.product_count is kept by F() updates and must survive business edits."""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            username='owner', email='owner@example.com', password='pw-owner-1'
+        )
+        self.business = Business.objects.create(
+            user=user, business_info='Name: Owner Shop', chroma_id='business_owner'
+        )
+
+    def test_business_update_keeps_count_from_other_instance(self):
+        # The product is created through a separately loaded Business instance,
+        # so self.business still holds product_count = 0 in memory
+        Product.objects.create(
+            business=Business.objects.get(pk=self.business.pk),
+            product_description='Tea kettle',
+            chroma_id='product_1'
+        )
+        self.assertEqual(self.business.product_count, 0)
+
+        BusinessSerializer().update(self.business, {'business_info': 'Name: Owner Shop\nAddress: Main St'})
+
+        self.business.refresh_from_db()
+        self.assertEqual(self.business.business_info, 'Name: Owner Shop\nAddress: Main St')
+        self.assertEqual(self.business.product_count, 1)
+
+    def test_full_save_does_not_write_product_count(self):
+        Product.objects.create(business=self.business, product_description='Teapot', chroma_id='product_2')
+        self.business.save()
+
+        self.business.refresh_from_db()
+        self.assertEqual(self.business.product_count, 1)
+
+
+class ProductDictTests(TestCase):
+    """The hot-path product dicts must match the serializers' output exactly."""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            username='maker', email='maker@example.com', password='pw-maker-1'
+        )
+        business = Business.objects.create(
+            user=user, business_info='Name: Maker Shop\nAddress: Side St', chroma_id='business_maker',
+            logo=b'logo', logo_content_type='image/png'
+        )
+        self.product = Product.objects.create(business=business, product_description='Mug', chroma_id='product_mug')
+        ProductImage.objects.create(
+            product=self.product, image_data=b'second', image_filename='b.png', image_content_type='image/png', order=1
+        )
+        ProductImage.objects.create(
+            product=self.product, image_data=b'first', image_filename='a.png', image_content_type='image/png', order=0
+        )
+
+    def test_product_to_dict_matches_product_serializer(self):
+        product = Product.objects.select_related('business', 'business__user').prefetch_related('images').get(
+            pk=self.product.pk
+        )
+        self.assertEqual(product_to_dict(product), ProductSerializer(product).data)
+
+    def test_product_image_to_dict_matches_for_instances_and_values_rows(self):
+        for image in ProductImage.objects.filter(product=self.product):
+            expected = ProductImageSerializer(image).data
+            self.assertEqual(product_image_to_dict(image), expected)
+            self.assertEqual(product_image_to_dict(ProductImage.objects.values().get(pk=image.pk)), expected)
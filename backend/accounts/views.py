@@ -3,9 +3,10 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from django.contrib.auth import authenticate, get_user_model
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Count, Q
 from .serializers import (
     RegisterSerializer, 
     LoginSerializer, 
@@ -16,9 +17,11 @@ from .serializers import (
 )
 from .permissions import IsAdminUser
 from .models import HuggingFaceToken, UserHFTokenAssignment
+import logging
 import random
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 
 def get_client_ip(request):
@@ -358,9 +361,10 @@ class TokenRefreshView(generics.GenericAPIView):
             )
             
             return response
-        except Exception as e:
+        except (TokenError, InvalidToken, KeyError):
+            logger.warning('Token refresh failed', exc_info=True)
             return Response(
-                {'error': str(e)},
+                {'error': 'Invalid token'},
                 status=status.HTTP_401_UNAUTHORIZED
             )
 
@@ -429,9 +433,10 @@ class LogoutView(generics.GenericAPIView):
             response.delete_cookie('refresh_token', path='/')
             
             return response
-        except Exception as e:
+        except (TokenError, InvalidToken, KeyError):
+            logger.warning('Logout failed', exc_info=True)
             return Response(
-                {'error': str(e)},
+                {'error': 'Invalid token'},
                 status=status.HTTP_400_BAD_REQUEST
             )
     
@@ -483,14 +488,16 @@ class HuggingFaceTokenViewSet(viewsets.ModelViewSet):
         """
         Get statistics about token usage.
         """
-        total_tokens = HuggingFaceToken.objects.count()
-        active_tokens = HuggingFaceToken.objects.filter(is_active=True).count()
+        token_stats = HuggingFaceToken.objects.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(is_active=True))
+        )
         total_assignments = UserHFTokenAssignment.objects.filter(is_active=True).count()
         
         return Response({
-            'total_tokens': total_tokens,
-            'active_tokens': active_tokens,
-            'inactive_tokens': total_tokens - active_tokens,
+            'total_tokens': token_stats['total'],
+            'active_tokens': token_stats['active'],
+            'inactive_tokens': token_stats['total'] - token_stats['active'],
             'active_assignments': total_assignments
         })
 
@@ -4,7 +4,9 @@ from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from .models import Business
 from .serializers_business import BusinessSerializer, BusinessCreateUpdateSerializer
-from chat.chroma_service import chroma_service
+from chat.chroma_service import get_chroma_service
+from chat.tasks import chroma_delete_business
+import base64
 
 
 class BusinessRegisterView(generics.CreateAPIView):
@@ -19,7 +21,7 @@ class BusinessRegisterView(generics.CreateAPIView):
         # All users can register businesses now (admins included)
         
         # Check if user already has a business
-        if hasattr(request.user, 'business'):
+        if Business.objects.filter(user_id=request.user.id).exists():
             return Response({
                 'error': 'You already have a registered business. Please update it instead.'
             }, status=status.HTTP_400_BAD_REQUEST)
@@ -27,17 +29,13 @@ class BusinessRegisterView(generics.CreateAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        # Create business
+        # Create business from the already validated input (no second validation pass)
         validated_data = serializer.validated_data
-        business_serializer = BusinessSerializer(data={
+        business = BusinessSerializer().create({
+            'user': request.user,
             'business_info': validated_data['business_info'],
-            'logo_upload': validated_data.get('logo', ''),
-            'user': request.user.id
+            'logo_upload': validated_data.get('logo', '')
         })
-        business_serializer.is_valid(raise_exception=True)
-        
-        # Save with user
-        business = business_serializer.save(user=request.user)
         
         return Response({
             'message': 'Business registered successfully',
@@ -64,27 +62,26 @@ class BusinessDetailView(generics.RetrieveUpdateDestroyAPIView):
         input_serializer = BusinessCreateUpdateSerializer(data=request.data, partial=partial)
         input_serializer.is_valid(raise_exception=True)
         
-        # Update using the full serializer
+        # Apply the validated input directly (no second validation pass)
         validated_data = input_serializer.validated_data
         update_data = {
-            'business_info': validated_data.get('business_info', instance.business_info),
             'logo_upload': validated_data.get('logo', '')
         }
+        if 'business_info' in validated_data:
+            update_data['business_info'] = validated_data['business_info']
         
-        serializer = self.get_serializer(instance, data=update_data, partial=True)
-        serializer.is_valid(raise_exception=True)
-        self.perform_update(serializer)
+        instance = BusinessSerializer().update(instance, update_data)
         
         return Response({
             'message': 'Business updated successfully',
-            'business': serializer.data
+            'business': self.get_serializer(instance).data
         })
     
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         
-        # Delete from ChromaDB
-        chroma_service.delete_business(instance.chroma_id)
+        # Delete from ChromaDB in the background once the delete is committed
+        chroma_delete_business(instance.chroma_id)
         
         # Delete from database
         self.perform_destroy(instance)
@@ -110,28 +107,25 @@ class BusinessSearchView(generics.GenericAPIView):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         # Search in ChromaDB
-        results = chroma_service.search_businesses(query, n_results)
+        results = get_chroma_service().search_businesses(query, n_results)
+        
+        # Get full business details from database in a single query, keyed by chroma_id
+        businesses_by_chroma_id = Business.objects.select_related('user').in_bulk(
+            [result['id'] for result in results], field_name='chroma_id'
+        )
         
-        # Get full business details from database
         businesses = []
         for result in results:
-            try:
-                # Extract user_id from chroma_id (format: business_{user_id}_{uuid})
-                parts = result['id'].split('_')
-                if len(parts) >= 2:
-                    user_id = int(parts[1])
-                    business = Business.objects.filter(user_id=user_id).first()
-                    if business:
-                        businesses.append({
-                            'id': business.id,
-                            'username': business.user.username,
-                            'business_info': business.business_info,
-                            'logo_base64': BusinessSerializer(business).data.get('logo_base64'),
-                            'relevance_score': 1 - result.get('distance', 0) if result.get('distance') is not None else None
-                        })
-            except Exception as e:
-                print(f"Error processing business result: {e}")
-                continue
+            business = businesses_by_chroma_id.get(result['id'])
+            if business:
+                businesses.append({
+                    'id': business.id,
+                    'username': business.user.username,
+                    'business_info': business.business_info,
+                    # Encode the logo directly rather than running the full serializer
+                    'logo_base64': base64.b64encode(business.logo).decode('utf-8') if business.logo else None,
+                    'relevance_score': max(0.0, 1 - result['distance']) if result.get('distance') is not None else None
+                })
         
         return Response({
             'query': query,
@@ -149,10 +143,7 @@ class MyBusinessView(generics.RetrieveAPIView):
     
     def get_object(self):
         # All users can have businesses (including admins)
-        try:
-            return Business.objects.get(user=self.request.user)
-        except Business.DoesNotExist:
-            return None
+        return Business.objects.select_related('user').filter(user_id=self.request.user.id).first()
     
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
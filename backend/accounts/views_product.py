@@ -1,13 +1,26 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.db.models import Count, OuterRef, Subquery
 from django.shortcuts import get_object_or_404
 from .models_product import Product, ProductImage
-from .serializers_product import ProductSerializer, ProductCreateUpdateSerializer
-from chat.chroma_service import chroma_service
+from .serializers_product import ProductSerializer, ProductCreateUpdateSerializer, product_image_to_dict
+from chat.chroma_service import get_chroma_service
+from chat.tasks import chroma_delete_product
 
 
-class ProductListCreateView(generics.ListCreateAPIView):
+class CurrentBusinessMixin:
+    """
+    Resolve the current user's business once per request and keep it on the
+    view as ``self.business`` (None if the user has not registered one).
+    """
+    
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.business = getattr(request.user, 'business', None)
+
+
+class ProductListCreateView(CurrentBusinessMixin, generics.ListCreateAPIView):
     """
     API endpoint to list all products for the current user's business
     or create a new product.
@@ -19,21 +32,21 @@ class ProductListCreateView(generics.ListCreateAPIView):
     def get_queryset(self):
         """Get products for current user's business."""
         # Check if user has a business
-        if not hasattr(self.request.user, 'business'):
+        if self.business is None:
             return Product.objects.none()
         
-        return Product.objects.filter(business=self.request.user.business).prefetch_related('images')
+        return Product.objects.filter(business=self.business).prefetch_related('images')
     
     def create(self, request, *args, **kwargs):
         """Create a new product for the current user's business."""
         # Check if user has a business
-        if not hasattr(request.user, 'business'):
+        if self.business is None:
             return Response({
                 'error': 'You must register a business first before adding products.'
             }, status=status.HTTP_400_BAD_REQUEST)
         
         # Check product limit (max 10 products per business)
-        existing_products_count = Product.objects.filter(business=request.user.business).count()
+        existing_products_count = self.business.product_count
         if existing_products_count >= 10:
             return Response({
                 'error': f'Maximum 10 products allowed per business. You already have {existing_products_count} products.'
@@ -48,12 +61,12 @@ class ProductListCreateView(generics.ListCreateAPIView):
         product_data = {
             'product_description': validated_data['product_description'],
             'images_upload': validated_data['images'],
-            'business': request.user.business.id
+            'business': self.business.id
         }
         
         serializer = self.get_serializer(data=product_data)
         serializer.is_valid(raise_exception=True)
-        product = serializer.save(business=request.user.business)
+        product = serializer.save(business=self.business)
         
         return Response({
             'message': 'Product created successfully',
@@ -61,7 +74,7 @@ class ProductListCreateView(generics.ListCreateAPIView):
         }, status=status.HTTP_201_CREATED)
 
 
-class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ProductDetailView(CurrentBusinessMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API endpoint to retrieve, update, or delete a product.
     Users can only access products from their own business.
@@ -71,10 +84,10 @@ class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
     
     def get_queryset(self):
         """Get products for current user's business."""
-        if not hasattr(self.request.user, 'business'):
+        if self.business is None:
             return Product.objects.none()
         
-        return Product.objects.filter(business=self.request.user.business).prefetch_related('images')
+        return Product.objects.filter(business=self.business).prefetch_related('images')
     
     def update(self, request, *args, **kwargs):
         """Update a product."""
@@ -108,8 +121,8 @@ class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
         """Delete a product and remove from ChromaDB."""
         instance = self.get_object()
         
-        # Delete from ChromaDB
-        chroma_service.delete_product(instance.chroma_id)
+        # Delete from ChromaDB in the background once the delete is committed
+        chroma_delete_product(instance.chroma_id)
         
         # Delete associated images (cascade should handle this, but explicit is better)
         instance.images.all().delete()
@@ -122,7 +135,7 @@ class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
         }, status=status.HTTP_200_OK)
 
 
-class ProductStatsView(generics.GenericAPIView):
+class ProductStatsView(CurrentBusinessMixin, generics.GenericAPIView):
     """
     API endpoint to get product statistics for current user's business.
     """
@@ -130,14 +143,13 @@ class ProductStatsView(generics.GenericAPIView):
     
     def get(self, request):
         """Get product statistics."""
-        if not hasattr(request.user, 'business'):
+        if self.business is None:
             return Response({
                 'has_business': False,
                 'message': 'You must register a business first.'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        business = request.user.business
-        products_count = Product.objects.filter(business=business).count()
+        products_count = self.business.product_count
         max_products = 10
         remaining_slots = max_products - products_count
         
@@ -168,29 +180,51 @@ class ProductSearchView(generics.GenericAPIView):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         # Search in ChromaDB
-        results = chroma_service.search_products(query, n_results, business_id)
+        results = get_chroma_service().search_products(query, n_results, business_id)
+        
+        chroma_ids = [result['id'] for result in results]
+        
+        # Fetch only the columns the response needs, as plain dicts keyed by chroma_id.
+        # The image count and the id of the first image (in display order) come
+        # from the same query, so full image rows are loaded only for first images.
+        first_image_id = ProductImage.objects.filter(
+            product=OuterRef('pk')
+        ).order_by('order', 'created_at', 'id').values('id')[:1]
+        products_by_chroma_id = {
+            row['chroma_id']: row
+            for row in Product.objects.filter(chroma_id__in=chroma_ids).annotate(
+                image_count=Count('images'),
+                first_image_id=Subquery(first_image_id)
+            ).values(
+                'id', 'business_id', 'business__user__username', 'product_description', 'chroma_id',
+                'image_count', 'first_image_id'
+            )
+        }
+        
+        first_images = {
+            image['id']: image
+            for image in ProductImage.objects.filter(
+                id__in=[row['first_image_id'] for row in products_by_chroma_id.values() if row['first_image_id']]
+            ).values('id', 'product_id', 'image_data', 'image_filename', 'image_content_type', 'order', 'created_at')
+        }
         
-        # Get full product details from database
+        # Build results in ChromaDB relevance order
         products = []
         for result in results:
-            try:
-                # Extract product_id from chroma_id (format: product_{business_id}_{uuid})
-                chroma_id = result['id']
-                product = Product.objects.filter(chroma_id=chroma_id).prefetch_related('images').first()
-                
-                if product:
-                    products.append({
-                        'id': product.id,
-                        'business_id': product.business.id,
-                        'username': product.business.user.username,
-                        'product_description': product.product_description,
-                        'images_count': product.images.count(),
-                        'first_image': ProductSerializer(product).data['images'][0] if product.images.exists() else None,
-                        'relevance_score': 1 - result.get('distance', 0) if result.get('distance') is not None else None
-                    })
-            except Exception as e:
-                print(f"Error processing product result: {e}")
+            product = products_by_chroma_id.get(result['id'])
+            if not product:
                 continue
+            
+            first_image = first_images.get(product['first_image_id'])
+            products.append({
+                'id': product['id'],
+                'business_id': product['business_id'],
+                'username': product['business__user__username'],
+                'product_description': product['product_description'],
+                'images_count': product['image_count'],
+                'first_image': product_image_to_dict(first_image) if first_image else None,
+                'relevance_score': max(0.0, 1 - result['distance']) if result.get('distance') is not None else None
+            })
         
         return Response({
             'query': query,
@@ -21,6 +21,9 @@ django.setup()
 
 from accounts.models import User, HuggingFaceToken
 
+# Placeholder/test token values that should never be used
+INVALID_TOKEN_VALUES = frozenset({'a', 'aa', 'test', 'your-huggingface-token-here'})
+
 
 def add_token(token_value, token_name):
     """Add a HuggingFace token to the database."""
@@ -57,17 +60,16 @@ def add_token(token_value, token_name):
 
 def delete_invalid_tokens():
     """Delete tokens that look invalid (too short or test tokens)."""
-    invalid_tokens = HuggingFaceToken.objects.filter(
-        token__in=['a', 'aa', 'test', 'your-huggingface-token-here']
-    )
+    invalid_tokens = HuggingFaceToken.objects.filter(token__in=INVALID_TOKEN_VALUES)
     
-    count = invalid_tokens.count()
-    if count > 0:
-        print(f"\nFound {count} invalid test token(s). Deleting...")
-        for token in invalid_tokens:
-            print(f"  Deleting: {token.name} (token: {token.token})")
+    # Fetch only the columns we print, then delete without re-reading the rows
+    rows = list(invalid_tokens.values_list('name', 'token'))
+    if rows:
+        print(f"\nFound {len(rows)} invalid test token(s). Deleting...")
+        for name, token in rows:
+            print(f"  Deleting: {name} (token: {token})")
         invalid_tokens.delete()
-        print(f"✓ Deleted {count} invalid token(s)")
+        print(f"✓ Deleted {len(rows)} invalid token(s)")
 
 
 if __name__ == '__main__':
@@ -1,11 +1,36 @@
 from django.contrib import admin
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.html import format_html
 from .models import Conversation, Message
 
+# Maximum number of messages rendered inline on the conversation page
+MESSAGE_INLINE_LIMIT = 50
+
+
+class RecentMessagesFormSet(BaseInlineFormSet):
+    """Inline formset that only loads the most recent messages of a conversation."""
+
+    def get_queryset(self):
+        # The inline formset filters by conversation after get_queryset() on the
+        # inline, so the slice has to be applied here rather than there
+        if not hasattr(self, '_queryset'):
+            self._queryset = super().get_queryset()[:MESSAGE_INLINE_LIMIT]
+        return self._queryset
+
 
 class MessageInline(admin.TabularInline):
     model = Message
+    formset = RecentMessagesFormSet
     extra = 0
-    readonly_fields = ('created_at',)
+    max_num = MESSAGE_INLINE_LIMIT
+    can_delete = False
+    ordering = ('-created_at',)
+    readonly_fields = ('role', 'content', 'created_at')
+    verbose_name_plural = f'Messages (latest {MESSAGE_INLINE_LIMIT})'
+
+    def has_add_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(Conversation)
@@ -13,9 +38,16 @@ class ConversationAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'title', 'created_at', 'updated_at')
     list_filter = ('created_at', 'updated_at')
     search_fields = ('title', 'user__username')
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('created_at', 'updated_at', 'all_messages_link')
     inlines = [MessageInline]
 
+    def all_messages_link(self, obj):
+        if not obj.pk:
+            return '-'
+        url = reverse('admin:chat_message_changelist')
+        return format_html('<a href="{}?conversation__id__exact={}">View all messages</a>', url, obj.pk)
+    all_messages_link.short_description = 'Messages'
+
 
 @admin.register(Message)
 class MessageAdmin(admin.ModelAdmin):
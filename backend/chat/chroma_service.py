@@ -1,13 +1,50 @@
 """
 ChromaDB service for storing and retrieving business information embeddings.
 """
-import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Optional
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+import logging
 import os
+import threading
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
+# Sentence-transformers model used for all embeddings
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# Number of query embeddings kept in the per-process LRU cache
+QUERY_EMBEDDING_CACHE_SIZE = 4096
+
+# Collection metadata, including HNSW index settings. Embeddings are stored
+# L2-normalized, so inner-product space ("ip", distance = 1 - dot product)
+# gives cosine distance without re-normalizing vectors on every comparison.
+# HNSW settings only take effect when a collection is created; run
+# `python manage.py rebuild_chroma_collections` to apply them to an existing store.
+#
+# Businesses (one per user) are the chat's first-stage lookup, so their index
+# favours recall: a denser graph (M=32) and wider build/search beams.
+BUSINESS_COLLECTION_NAME = "business_information"
+BUSINESS_COLLECTION_METADATA = {
+    "description": "Business information for users",
+    "hnsw:space": "ip",
+    "hnsw:M": 32,
+    "hnsw:construction_ef": 200,
+    "hnsw:search_ef": 64,
+}
+
+# Products (at most 10 per business) use a sparser graph (M=8) to save memory,
+# while a wider search beam (search_ef=40) keeps recall high.
+PRODUCT_COLLECTION_NAME = "product_information"
+PRODUCT_COLLECTION_METADATA = {
+    "description": "Product information for businesses",
+    "hnsw:space": "ip",
+    "hnsw:M": 8,
+    "hnsw:construction_ef": 80,
+    "hnsw:search_ef": 40,
+}
+
 
 class ChromaDBService:
     """
@@ -16,35 +53,198 @@ class ChromaDBService:
     
     def __init__(self):
         """Initialize ChromaDB client and embedding model."""
-        # Use persistent storage in the backend directory
+        # Heavy dependencies are imported here rather than at module level so that
+        # importing this module (e.g. from the URLconf) does not load torch/chromadb
+        import chromadb
+        import torch
+        from chromadb.config import Settings
         from django.conf import settings
-        base_dir = settings.BASE_DIR
-        chroma_dir = base_dir / 'chroma_data'
-        chroma_dir.mkdir(exist_ok=True)
+        from sentence_transformers import SentenceTransformer
         
-        # Initialize ChromaDB client with persistent storage
-        self.client = chromadb.PersistentClient(
-            path=str(chroma_dir),
-            settings=Settings(
-                anonymized_telemetry=False,
-                allow_reset=True
+        if settings.CHROMA_MODE == 'server':
+            # Connect to a standalone Chroma server shared by all workers
+            self.client = chromadb.HttpClient(
+                host=settings.CHROMA_HOST,
+                port=settings.CHROMA_PORT,
+                settings=Settings(anonymized_telemetry=False)
+            )
+        else:
+            # Use persistent storage in the backend directory
+            base_dir = settings.BASE_DIR
+            chroma_dir = base_dir / 'chroma_data'
+            chroma_dir.mkdir(exist_ok=True)
+            
+            # Initialize ChromaDB client with persistent storage
+            self.client = chromadb.PersistentClient(
+                path=str(chroma_dir),
+                settings=Settings(
+                    anonymized_telemetry=False,
+                    allow_reset=True
+                )
             )
-        )
         
-        # Initialize embedding model
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Initialize embedding model, on the GPU (in FP16 unless disabled) when one is available
+        device = settings.EMBEDDING_DEVICE or ('cuda' if torch.cuda.is_available() else 'cpu')
+        num_threads = min(8, os.cpu_count() or 1)
+        if settings.EMBEDDING_BACKEND == 'onnx':
+            # ONNX Runtime export of the same model (optional dependency, see onnx_encoder.py)
+            from .onnx_encoder import OnnxSentenceEncoder
+            self.embedding_model = OnnxSentenceEncoder(
+                EMBEDDING_MODEL_NAME,
+                cache_dir=settings.BASE_DIR / 'onnx_models',
+                device=device,
+                num_threads=num_threads
+            )
+        else:
+            if device == 'cpu':
+                # Cap intra-op threads so encodes do not oversubscribe the worker's cores
+                torch.set_num_threads(num_threads)
+            self.embedding_model = SentenceTransformer(EMBEDDING_MODEL_NAME, device=device)
+            if device.startswith('cuda') and settings.EMBEDDING_FP16:
+                self.embedding_model.half()
+            elif device == 'cpu' and settings.EMBEDDING_QUANTIZE:
+                # Dynamic INT8 quantization of the encoder's Linear layers (CPU only)
+                transformer = self.embedding_model[0]
+                transformer.auto_model = torch.quantization.quantize_dynamic(
+                    transformer.auto_model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+        self.embedding_model.max_seq_length = settings.EMBEDDING_MAX_SEQ_LENGTH
+        
+        # Run one encode up front so tokenizer setup and CUDA/cuBLAS initialisation
+        # happen here rather than on the first user request
+        self.embedding_model.encode(["warmup"], show_progress_bar=False)
         
         # Get or create the business collection
-        self.business_collection = self.client.get_or_create_collection(
-            name="business_information",
-            metadata={"description": "Business information for users"}
+        self.business_collection = self._get_or_create_collection(
+            name=BUSINESS_COLLECTION_NAME,
+            metadata=BUSINESS_COLLECTION_METADATA
         )
         
         # Get or create the products collection
-        self.products_collection = self.client.get_or_create_collection(
-            name="product_information",
-            metadata={"description": "Product information for businesses"}
+        self.products_collection = self._get_or_create_collection(
+            name=PRODUCT_COLLECTION_NAME,
+            metadata=PRODUCT_COLLECTION_METADATA
         )
+        
+        # LRU cache of query embeddings: {(model version, normalized query): (1, dim) array}.
+        # The model version is part of the key so entries never outlive a model change.
+        self._embedding_version = f"{EMBEDDING_MODEL_NAME}:{settings.EMBEDDING_BACKEND}"
+        self._query_embeddings = OrderedDict()
+        self._query_embeddings_lock = threading.Lock()
+    
+    def _get_or_create_collection(self, name: str, metadata: Dict):
+        """
+        Open an existing collection as-is, or create it with the given metadata.
+        
+        HNSW settings (distance space, M, ef) are fixed when a collection is
+        created, so the metadata is only applied to new collections; collections
+        created with older settings (e.g. L2 space, see _to_cosine_distance) keep them
+        until they are rebuilt with recreate_collections().
+        """
+        try:
+            return self.client.get_collection(name=name)
+        except Exception:
+            return self.client.create_collection(name=name, metadata=metadata)
+    
+    @staticmethod
+    def _hnsw_settings_differ(collection, metadata: Dict) -> bool:
+        """Return True if a collection was created with different HNSW settings."""
+        current = collection.metadata or {}
+        defaults = {"hnsw:space": "l2"}
+        return any(
+            current.get(key, defaults.get(key)) != value
+            for key, value in metadata.items()
+            if key.startswith("hnsw:")
+        )
+    
+    def recreate_collections(self, force: bool = False) -> List[str]:
+        """
+        Drop and recreate collections whose HNSW settings are out of date.
+        
+        Recreated collections are empty; the caller is responsible for
+        re-adding their documents (see the rebuild_chroma_collections command).
+        
+        Args:
+            force: Recreate the collections even if their settings already match
+            
+        Returns:
+            Names of the collections that were recreated
+        """
+        recreated = []
+        for attr, name, metadata in (
+            ("business_collection", BUSINESS_COLLECTION_NAME, BUSINESS_COLLECTION_METADATA),
+            ("products_collection", PRODUCT_COLLECTION_NAME, PRODUCT_COLLECTION_METADATA),
+        ):
+            collection = getattr(self, attr)
+            if not force and not self._hnsw_settings_differ(collection, metadata):
+                continue
+            
+            self.client.delete_collection(name=name)
+            setattr(self, attr, self.client.create_collection(name=name, metadata=metadata))
+            recreated.append(name)
+        return recreated
+    
+    @staticmethod
+    def _to_cosine_distance(collection, distance: Optional[float]) -> Optional[float]:
+        """
+        Convert a query distance from a collection to cosine distance (1 - cosine similarity).
+        
+        Embeddings are L2-normalized, so inner-product ("ip") and cosine distances
+        already equal 1 - cosine similarity, while a squared L2 distance d from a
+        legacy L2 collection equals 2 * (1 - cosine similarity), i.e. d / 2.
+        """
+        if distance is None:
+            return None
+        if (collection.metadata or {}).get("hnsw:space", "l2") == "l2":
+            return distance / 2
+        return distance
+    
+    def _encode(self, texts, batch_size: int = 32) -> np.ndarray:
+        """Encode text(s) into L2-normalized float32 embeddings."""
+        # FP16 models return float16 arrays; keep a single dtype for everything downstream
+        return self.embedding_model.encode(
+            texts,
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        ).astype(np.float32, copy=False)
+    
+    def _encode_query(self, query: str) -> np.ndarray:
+        """
+        Return the embedding for a search query, reusing recent results.
+        
+        The embedding is a (1, dim) float32 array: ChromaDB accepts 2-D arrays
+        as query_embeddings/embeddings directly but rejects a bare 1-D vector.
+        Callers must not modify it, as the same array is handed out on a hit.
+        
+        The model's tokenizer is uncased and ignores surrounding whitespace, so
+        queries are cached under their stripped, lower-cased text.
+        """
+        text = query.strip().lower()
+        key = (self._embedding_version, text)
+        with self._query_embeddings_lock:
+            embedding = self._query_embeddings.get(key)
+            if embedding is not None:
+                self._query_embeddings.move_to_end(key)
+                return embedding
+        
+        embedding = self._encode([text])
+        with self._query_embeddings_lock:
+            self._query_embeddings[key] = embedding
+            self._query_embeddings.move_to_end(key)
+            if len(self._query_embeddings) > QUERY_EMBEDDING_CACHE_SIZE:
+                self._query_embeddings.popitem(last=False)
+        return embedding
+    
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Embed a query with the service's model, sharing the search query cache.
+        
+        Used by other ChromaDB-backed features (see semantic_cache.py) so a
+        chat message is only encoded once per request.
+        """
+        return self._encode_query(query)
     
     def add_business(self, business_id: str, business_info: str, username: str) -> bool:
         """
@@ -58,64 +258,81 @@ class ChromaDBService:
         Returns:
             True if successful, False otherwise
         """
+        return self.add_businesses_bulk([(business_id, business_info, username)])
+    
+    def add_businesses_bulk(self, items: List[Tuple[str, str, str]]) -> bool:
+        """
+        Add or update several businesses in ChromaDB using a single batched
+        embedding pass and a single upsert.
+        
+        Args:
+            items: List of (business_id, business_info, username) tuples
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        if not items:
+            return True
+        
         try:
-            # Generate embedding
-            embedding = self.embedding_model.encode(business_info).tolist()
+            documents = [business_info for _, business_info, _ in items]
+            
+            # Generate all embeddings in one forward pass
+            embeddings = self._encode(documents, batch_size=64)
             
             # Add to ChromaDB
             self.business_collection.upsert(
-                ids=[business_id],
-                embeddings=[embedding],
-                documents=[business_info],
-                metadatas=[{"username": username, "type": "business"}]
+                ids=[business_id for business_id, _, _ in items],
+                embeddings=embeddings,
+                documents=documents,
+                metadatas=[{"username": username, "type": "business"} for _, _, username in items]
             )
             return True
-        except Exception as e:
-            print(f"Error adding business to ChromaDB: {e}")
+        except Exception:
+            logger.warning("Error adding businesses to ChromaDB", exc_info=True)
             return False
     
-    def search_businesses(self, query: str, n_results: int = 3, distance_threshold: float = 1.2) -> List[Dict]:
+    def search_businesses(self, query: str, n_results: int = 3, distance_threshold: float = 0.6, query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
         """
         Search for businesses based on a query.
         
         Args:
             query: Search query text
             n_results: Number of results to return
-            distance_threshold: Maximum distance for a business to be considered relevant.
-                               Lower values = stricter matching. ChromaDB uses L2 distance:
-                               - 0.0-0.5: Very similar (exact or near-exact match)
-                               - 0.5-1.0: Similar (related businesses)
-                               - 1.0-1.5: Somewhat related
-                               - >1.5: Probably not relevant
+            distance_threshold: Maximum cosine distance (1 - cosine similarity) for a
+                               business to be considered relevant.
+                               Lower values = stricter matching:
+                               - 0.0-0.25: Very similar (exact or near-exact match)
+                               - 0.25-0.5: Similar (related businesses)
+                               - 0.5-0.75: Somewhat related
+                               - >0.75: Probably not relevant
+            query_embedding: Precomputed embedding of the query (see embed_query), to
+                             avoid encoding it again when it is used for several searches
             
         Returns:
             List of dictionaries containing business information (only relevant matches)
         """
         try:
-            # Check how many businesses exist in the collection
-            collection_count = self.business_collection.count()
-            
-            # If no businesses, return empty list
-            if collection_count == 0:
-                return []
-            
-            # Adjust n_results to not exceed available businesses
-            actual_n_results = min(n_results, collection_count)
-            
-            # Generate query embedding
-            query_embedding = self.embedding_model.encode(query).tolist()
+            # Generate query embedding (cached for repeated queries)
+            if query_embedding is None:
+                query_embedding = self._encode_query(query)
             
-            # Search in ChromaDB
+            # Search in ChromaDB; it returns fewer than n_results (or none) when
+            # the collection is smaller, so no count() precheck is needed
             results = self.business_collection.query(
-                query_embeddings=[query_embedding],
-                n_results=actual_n_results
+                query_embeddings=query_embedding,
+                n_results=n_results,
+                include=["documents", "metadatas", "distances"]
             )
             
             # Format results - only include businesses within the distance threshold
             businesses = []
             if results and results['documents']:
                 for i in range(len(results['documents'][0])):
-                    distance = results['distances'][0][i] if 'distances' in results else None
+                    distance = self._to_cosine_distance(
+                        self.business_collection,
+                        results['distances'][0][i] if results.get('distances') else None
+                    )
                     
                     # Only include businesses that are actually relevant (within threshold)
                     if distance is not None and distance > distance_threshold:
@@ -130,8 +347,8 @@ class ChromaDBService:
                     })
             
             return businesses
-        except Exception as e:
-            print(f"Error searching businesses in ChromaDB: {e}")
+        except Exception:
+            logger.warning("Error searching businesses in ChromaDB", exc_info=True)
             return []
     
     def get_business(self, business_id: str) -> Optional[Dict]:
@@ -157,8 +374,8 @@ class ChromaDBService:
                     'username': results['metadatas'][0].get('username', 'Unknown')
                 }
             return None
-        except Exception as e:
-            print(f"Error getting business from ChromaDB: {e}")
+        except Exception:
+            logger.warning("Error getting business from ChromaDB", exc_info=True)
             return None
     
     def delete_business(self, business_id: str) -> bool:
@@ -174,8 +391,8 @@ class ChromaDBService:
         try:
             self.business_collection.delete(ids=[business_id])
             return True
-        except Exception as e:
-            print(f"Error deleting business from ChromaDB: {e}")
+        except Exception:
+            logger.warning("Error deleting business from ChromaDB", exc_info=True)
             return False
     
     def get_all_businesses(self) -> List[Dict]:
@@ -186,23 +403,45 @@ class ChromaDBService:
             List of dictionaries containing business information
         """
         try:
+            return list(self.iter_all_businesses())
+        except Exception:
+            logger.warning("Error getting all businesses from ChromaDB", exc_info=True)
+            return []
+    
+    def iter_all_businesses(self, batch_size: int = 1000) -> Iterator[Dict]:
+        """
+        Yield all businesses from ChromaDB, fetching them in pages.
+        
+        Unlike get_all_businesses, memory use is bounded by batch_size and
+        errors from ChromaDB are raised to the caller.
+        
+        Args:
+            batch_size: Number of businesses fetched per request
+            
+        Yields:
+            Dictionaries containing business information
+        """
+        offset = 0
+        while True:
             results = self.business_collection.get(
+                limit=batch_size,
+                offset=offset,
                 include=["documents", "metadatas"]
             )
+            ids = results['ids'] if results else []
+            if not ids:
+                return
+            
+            for business_id, document, metadata in zip(ids, results['documents'], results['metadatas']):
+                yield {
+                    'id': business_id,
+                    'business_info': document,
+                    'username': (metadata or {}).get('username', 'Unknown')
+                }
             
-            businesses = []
-            if results and results['documents']:
-                for i in range(len(results['documents'])):
-                    businesses.append({
-                        'id': results['ids'][i],
-                        'business_info': results['documents'][i],
-                        'username': results['metadatas'][i].get('username', 'Unknown')
-                    })
-            
-            return businesses
-        except Exception as e:
-            print(f"Error getting all businesses from ChromaDB: {e}")
-            return []
+            if len(ids) < batch_size:
+                return
+            offset += len(ids)
     
     # Product methods
     def add_product(self, product_id: str, product_description: str, business_id: int, username: str, product_db_id: int = None) -> bool:
@@ -219,34 +458,64 @@ class ChromaDBService:
         Returns:
             True if successful, False otherwise
         """
-        try:
-            # Generate embedding
-            embedding = self.embedding_model.encode(product_description).tolist()
+        return self.add_products_bulk([
+            (product_id, product_description, business_id, username, product_db_id)
+        ])
+    
+    def add_products_bulk(self, items: List[Tuple[str, str, int, str, Optional[int]]]) -> bool:
+        """
+        Add or update several products in ChromaDB using a single batched
+        embedding pass and a single upsert.
+        
+        Args:
+            items: List of (product_id, product_description, business_id, username, product_db_id)
+                   tuples. product_db_id may be None.
             
-            # Prepare metadata
-            metadata = {
-                "username": username,
-                "business_id": business_id,
-                "type": "product"
-            }
+        Returns:
+            True if successful, False otherwise
+        """
+        if not items:
+            return True
+        
+        try:
+            # Generate all embeddings in one forward pass
+            embeddings = self._encode(
+                [product_description for _, product_description, _, _, _ in items],
+                batch_size=64
+            )
             
-            # Add product_db_id if provided
-            if product_db_id is not None:
-                metadata["product_db_id"] = product_db_id
+            ids = []
+            documents = []
+            metadatas = []
+            for product_id, product_description, business_id, username, product_db_id in items:
+                # Prepare metadata
+                metadata = {
+                    "username": username,
+                    "business_id": business_id,
+                    "type": "product"
+                }
+                
+                # Add product_db_id if provided
+                if product_db_id is not None:
+                    metadata["product_db_id"] = product_db_id
+                
+                ids.append(product_id)
+                documents.append(product_description)
+                metadatas.append(metadata)
             
             # Add to ChromaDB
             self.products_collection.upsert(
-                ids=[product_id],
-                embeddings=[embedding],
-                documents=[product_description],
-                metadatas=[metadata]
+                ids=ids,
+                embeddings=embeddings,
+                documents=documents,
+                metadatas=metadatas
             )
             return True
-        except Exception as e:
-            print(f"Error adding product to ChromaDB: {e}")
+        except Exception:
+            logger.warning("Error adding products to ChromaDB", exc_info=True)
             return False
     
-    def search_products(self, query: str, n_results: int = 5, business_id: Optional[int] = None, distance_threshold: float = 1.2) -> List[Dict]:
+    def search_products(self, query: str, n_results: int = 5, business_id: Optional[int] = None, distance_threshold: float = 0.6, query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
         """
         Search for products based on a query.
         
@@ -254,44 +523,43 @@ class ChromaDBService:
             query: Search query text
             n_results: Number of results to return
             business_id: Optional business ID to filter results
-            distance_threshold: Maximum distance for a product to be considered relevant.
-                               Lower values = stricter matching. ChromaDB uses L2 distance:
-                               - 0.0-0.5: Very similar (exact or near-exact match)
-                               - 0.5-1.0: Similar (related products)
-                               - 1.0-1.5: Somewhat related
-                               - >1.5: Probably not relevant
+            distance_threshold: Maximum cosine distance (1 - cosine similarity) for a
+                               product to be considered relevant.
+                               Lower values = stricter matching:
+                               - 0.0-0.25: Very similar (exact or near-exact match)
+                               - 0.25-0.5: Similar (related products)
+                               - 0.5-0.75: Somewhat related
+                               - >0.75: Probably not relevant
+            query_embedding: Precomputed embedding of the query (see embed_query)
             
         Returns:
             List of dictionaries containing product information (only relevant matches)
         """
         try:
-            # Check how many products exist in the collection
-            collection_count = self.products_collection.count()
+            # Generate query embedding (cached for repeated queries)
+            if query_embedding is None:
+                query_embedding = self._encode_query(query)
             
-            # If no products, return empty list
-            if collection_count == 0:
-                return []
-            
-            # Adjust n_results to not exceed available products
-            actual_n_results = min(n_results, collection_count)
-            
-            # Generate query embedding
-            query_embedding = self.embedding_model.encode(query).tolist()
-            
-            # Search in ChromaDB with optional filtering
+            # Search in ChromaDB with optional filtering; like search_businesses, it
+            # returns fewer than n_results (or none) when fewer products match, so no
+            # count() precheck is needed
             where_filter = {"business_id": business_id} if business_id else None
             
             results = self.products_collection.query(
-                query_embeddings=[query_embedding],
-                n_results=actual_n_results,
-                where=where_filter if where_filter else None
+                query_embeddings=query_embedding,
+                n_results=n_results,
+                where=where_filter if where_filter else None,
+                include=["documents", "metadatas", "distances"]
             )
             
             # Format results - only include products within the distance threshold
             products = []
             if results and results['documents']:
                 for i in range(len(results['documents'][0])):
-                    distance = results['distances'][0][i] if 'distances' in results else None
+                    distance = self._to_cosine_distance(
+                        self.products_collection,
+                        results['distances'][0][i] if results.get('distances') else None
+                    )
                     
                     # Only include products that are actually relevant (within threshold)
                     if distance is not None and distance > distance_threshold:
@@ -308,8 +576,8 @@ class ChromaDBService:
                     })
             
             return products
-        except Exception as e:
-            print(f"Error searching products in ChromaDB: {e}")
+        except Exception:
+            logger.warning("Error searching products in ChromaDB", exc_info=True)
             return []
     
     def get_product(self, product_id: str) -> Optional[Dict]:
@@ -336,8 +604,8 @@ class ChromaDBService:
                     'business_id': results['metadatas'][0].get('business_id')
                 }
             return None
-        except Exception as e:
-            print(f"Error getting product from ChromaDB: {e}")
+        except Exception:
+            logger.warning("Error getting product from ChromaDB", exc_info=True)
             return None
     
     def delete_product(self, product_id: str) -> bool:
@@ -353,8 +621,8 @@ class ChromaDBService:
         try:
             self.products_collection.delete(ids=[product_id])
             return True
-        except Exception as e:
-            print(f"Error deleting product from ChromaDB: {e}")
+        except Exception:
+            logger.warning("Error deleting product from ChromaDB", exc_info=True)
             return False
     
     def delete_products_by_business(self, business_id: int) -> bool:
@@ -368,21 +636,29 @@ class ChromaDBService:
             True if successful, False otherwise
         """
         try:
-            # Get all products for this business
-            results = self.products_collection.get(
-                where={"business_id": business_id},
-                include=["metadatas"]
-            )
-            
-            if results and results['ids']:
-                # Delete all matching products
-                self.products_collection.delete(ids=results['ids'])
-            
+            # Delete all products for this business in a single call
+            self.products_collection.delete(where={"business_id": business_id})
             return True
-        except Exception as e:
-            print(f"Error deleting products by business from ChromaDB: {e}")
+        except Exception:
+            logger.warning("Error deleting products by business from ChromaDB", exc_info=True)
             return False
 
 
-# Create a singleton instance
-chroma_service = ChromaDBService()
+# Lazily created per-process singleton (see get_chroma_service)
+_chroma_service = None
+_chroma_service_lock = threading.Lock()
+
+
+def get_chroma_service() -> ChromaDBService:
+    """
+    Return the process-wide ChromaDBService, creating it on first use.
+    
+    Construction loads the embedding model and opens the ChromaDB store, so it
+    is deferred until a request actually needs it rather than done at import.
+    """
+    global _chroma_service
+    if _chroma_service is None:
+        with _chroma_service_lock:
+            if _chroma_service is None:
+                _chroma_service = ChromaDBService()
+    return _chroma_service
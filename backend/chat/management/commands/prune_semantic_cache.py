@@ -0,0 +1,25 @@
+"""
+Management command to delete expired entries from the chat semantic cache.
+
+Usage:
+    python manage.py prune_semantic_cache
+    python manage.py prune_semantic_cache --max-age 86400  # Delete entries older than a day
+"""
+from django.core.management.base import BaseCommand
+from chat import semantic_cache
+
+
+class Command(BaseCommand):
+    help = 'Delete cached chat responses older than CHAT_SEMANTIC_CACHE_TTL from ChromaDB'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-age',
+            type=int,
+            default=None,
+            help='Maximum age in seconds of entries to keep (default: CHAT_SEMANTIC_CACHE_TTL)',
+        )
+
+    def handle(self, *args, **options):
+        deleted = semantic_cache.prune(max_age=options['max_age'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired semantic cache entries'))
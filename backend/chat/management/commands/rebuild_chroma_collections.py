@@ -0,0 +1,53 @@
+"""
+Management command to rebuild the ChromaDB collections from the database.
+
+HNSW index settings (distance space, M, ef) can only be set when a collection
+is created, so stores created before a settings change keep the old index
+until they are rebuilt with this command.
+
+Usage:
+    python manage.py rebuild_chroma_collections
+    python manage.py rebuild_chroma_collections --force  # Rebuild even if settings already match
+"""
+from django.core.management.base import BaseCommand
+from accounts.models import Business
+from accounts.models_product import Product
+from chat.chroma_service import get_chroma_service, BUSINESS_COLLECTION_NAME, PRODUCT_COLLECTION_NAME
+
+
+class Command(BaseCommand):
+    help = 'Recreate ChromaDB collections with the current HNSW settings and re-index them from the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rebuild the collections even if their HNSW settings are already up to date',
+        )
+
+    def handle(self, *args, **options):
+        chroma_service = get_chroma_service()
+
+        recreated = chroma_service.recreate_collections(force=options['force'])
+        if not recreated:
+            self.stdout.write(self.style.SUCCESS('ChromaDB collections are up to date, nothing to rebuild'))
+            return
+
+        if BUSINESS_COLLECTION_NAME in recreated:
+            items = list(Business.objects.values_list('chroma_id', 'business_info', 'user__username'))
+            if chroma_service.add_businesses_bulk(items):
+                self.stdout.write(self.style.SUCCESS(f'Rebuilt {BUSINESS_COLLECTION_NAME}: {len(items)} business(es)'))
+            else:
+                self.stdout.write(self.style.ERROR(f'Failed to re-index {BUSINESS_COLLECTION_NAME}'))
+
+        if PRODUCT_COLLECTION_NAME in recreated:
+            items = [
+                (chroma_id, product_description, business_id, username, product_id)
+                for product_id, chroma_id, product_description, business_id, username in Product.objects.values_list(
+                    'id', 'chroma_id', 'product_description', 'business_id', 'business__user__username'
+                )
+            ]
+            if chroma_service.add_products_bulk(items):
+                self.stdout.write(self.style.SUCCESS(f'Rebuilt {PRODUCT_COLLECTION_NAME}: {len(items)} product(s)'))
+            else:
+                self.stdout.write(self.style.ERROR(f'Failed to re-index {PRODUCT_COLLECTION_NAME}'))
@@ -44,6 +44,10 @@ class Message(models.Model):
     class Meta:
         db_table = 'messages'
         ordering = ['created_at']
+        indexes = [
+            # Messages are always read per conversation in created_at order
+            models.Index(fields=['conversation', 'created_at'], name='msg_conv_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.role}: {self.content[:50]}..."
@@ -0,0 +1,91 @@
+"""
+ONNX Runtime backend for the sentence-transformer embedding model.
+
+Optional: requires `optimum[onnxruntime]`, which is not part of requirements.txt.
+Enabled with EMBED_BACKEND=onnx.
+"""
+import os
+from pathlib import Path
+from typing import List, Union
+
+import numpy as np
+
+
+class OnnxSentenceEncoder:
+    """
+    Runs a sentence-transformers model with ONNX Runtime.
+
+    Implements the part of the SentenceTransformer interface used by
+    ChromaDBService (`encode()` and `max_seq_length`). The model is exported to
+    ONNX on first use and cached under `cache_dir`.
+    """
+
+    def __init__(self, model_name: str, cache_dir: Path, device: str = 'cpu', num_threads: int = 0):
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+
+        export_dir = Path(cache_dir) / model_name
+        provider = 'CUDAExecutionProvider' if device.startswith('cuda') else 'CPUExecutionProvider'
+
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = num_threads or os.cpu_count() or 1
+
+        if (export_dir / 'model.onnx').exists():
+            self.model = ORTModelForFeatureExtraction.from_pretrained(
+                export_dir, provider=provider, session_options=session_options
+            )
+            self.tokenizer = AutoTokenizer.from_pretrained(export_dir)
+        else:
+            model_id = f'sentence-transformers/{model_name}'
+            self.model = ORTModelForFeatureExtraction.from_pretrained(
+                model_id, export=True, provider=provider, session_options=session_options
+            )
+            self.tokenizer = AutoTokenizer.from_pretrained(model_id)
+            self.model.save_pretrained(export_dir)
+            self.tokenizer.save_pretrained(export_dir)
+
+        self.max_seq_length = 256
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+    ) -> np.ndarray:
+        """
+        Embed one text or a list of texts.
+
+        Uses mean pooling over the attention mask, like the sentence-transformers
+        model. Always returns float32 numpy arrays.
+        """
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+
+        batches = []
+        for start in range(0, len(sentences), batch_size):
+            inputs = self.tokenizer(
+                sentences[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors='np',
+            )
+            token_embeddings = self.model(**inputs).last_hidden_state
+            mask = inputs['attention_mask'][..., None].astype(np.float32)
+            summed = (token_embeddings * mask).sum(axis=1)
+            batches.append(summed / np.clip(mask.sum(axis=1), 1e-9, None))
+
+        if batches:
+            embeddings = np.concatenate(batches).astype(np.float32)
+        else:
+            embeddings = np.empty((0, self.model.config.hidden_size), dtype=np.float32)
+
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+
+        return embeddings[0] if single else embeddings
@@ -0,0 +1,180 @@
+"""
+Semantic cache of chat responses, stored in a dedicated ChromaDB collection.
+
+A cached response is reused when a new message is nearly identical (by
+embedding similarity) to one the same user already asked with exactly the same
+context: the conversation history sent to the model, retrieved
+business/product information and deep dive mode, hashed together (with the
+user id) into a context hash. Entries are also filtered by user id, so a
+response is never served to another user. Exact repeats are answered from
+Django's cache first, without embedding or querying ChromaDB; with the default
+per-process cache backend that tier only covers messages repeated within the
+same worker process (see CACHES in settings).
+
+Enabled with CHAT_SEMANTIC_CACHE=True; expired entries are removed with
+`python manage.py prune_semantic_cache`.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .chroma_service import get_chroma_service
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_CACHE_COLLECTION_NAME = "chat_semcache"
+SEMANTIC_CACHE_COLLECTION_METADATA = {
+    "description": "Cached chat responses keyed by message embedding",
+    "hnsw:space": "ip",
+}
+
+# Minimum cosine similarity between messages for a cached response to be reused
+SEMANTIC_CACHE_MIN_SIMILARITY = 0.92
+
+_collection = None
+_collection_lock = threading.Lock()
+
+
+def _get_collection():
+    """Return the cache collection, opening (or creating) it on first use."""
+    global _collection
+    if _collection is None:
+        with _collection_lock:
+            if _collection is None:
+                _collection = get_chroma_service().client.get_or_create_collection(
+                    name=SEMANTIC_CACHE_COLLECTION_NAME,
+                    metadata=SEMANTIC_CACHE_COLLECTION_METADATA
+                )
+    return _collection
+
+
+def _user_key(user_id: Optional[int]) -> int:
+    """User id as stored in entry metadata (0 when the service has no user)."""
+    return user_id or 0
+
+
+def context_hash(
+    user_id: Optional[int],
+    history: List[Dict[str, str]],
+    context_messages: List[Dict[str, str]],
+    deep_dive: bool
+) -> str:
+    """
+    Hash everything besides the user message that shapes a response.
+
+    history must be the full history sent to the model, since any earlier turn
+    can shape (and appear in) the response. Retrieved context is part of the
+    hash, so cached responses stop matching as soon as the business or product
+    information they were based on changes.
+    """
+    payload = json.dumps(
+        {
+            "user_id": _user_key(user_id),
+            "history": [[message["role"], message["content"]] for message in history],
+            "context": [message["content"] for message in context_messages],
+            "deep_dive": bool(deep_dive),
+        },
+        sort_keys=True
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _exact_key(user_message: str, ctx_hash: str, user_id: Optional[int]) -> str:
+    """Django cache key for a message (stripped, lower-cased) asked by a user with a context hash."""
+    message_hash = hashlib.sha1(user_message.strip().lower().encode("utf-8")).hexdigest()
+    return f"semcache:{_user_key(user_id)}:{ctx_hash}:{message_hash}"
+
+
+def lookup(user_message: str, ctx_hash: str, user_id: Optional[int]) -> Optional[str]:
+    """
+    Return a cached response for a message and context hash, if there is one.
+
+    Args:
+        user_message: The user's message
+        ctx_hash: Hash from context_hash() for the current request
+        user_id: Id of the user asking; only their own entries can match
+
+    Returns:
+        The cached response text, or None on a miss
+    """
+    try:
+        response = cache.get(_exact_key(user_message, ctx_hash, user_id))
+        if response is not None:
+            logger.debug("Semantic cache hit (exact match)")
+            return response
+
+        results = _get_collection().query(
+            query_embeddings=get_chroma_service().embed_query(user_message),
+            n_results=1,
+            where={"$and": [{"ctx_hash": ctx_hash}, {"user_id": _user_key(user_id)}]},
+            include=["documents", "metadatas", "distances"]
+        )
+        if not results['ids'] or not results['ids'][0]:
+            logger.debug("Semantic cache miss")
+            return None
+
+        # Inner-product distance of normalized embeddings is 1 - cosine similarity
+        similarity = 1 - results['distances'][0][0]
+        age = time.time() - results['metadatas'][0][0].get('created_at', 0)
+        if similarity < SEMANTIC_CACHE_MIN_SIMILARITY or age > settings.CHAT_SEMANTIC_CACHE_TTL:
+            logger.debug("Semantic cache miss (similarity %.3f, age %.0fs)", similarity, age)
+            return None
+
+        logger.debug("Semantic cache hit (similarity %.3f)", similarity)
+        return results['documents'][0][0]
+    except Exception:
+        logger.warning("Error reading the semantic cache", exc_info=True)
+        return None
+
+
+def store(user_message: str, ctx_hash: str, response: str, user_id: Optional[int]) -> None:
+    """
+    Cache a response for a message and context hash.
+
+    Args:
+        user_message: The user's message
+        ctx_hash: Hash from context_hash() for the request that produced the response
+        response: The AI's response text
+        user_id: Id of the user who asked
+    """
+    if not response:
+        return
+    try:
+        cache.set(_exact_key(user_message, ctx_hash, user_id), response, settings.CHAT_SEMANTIC_CACHE_TTL)
+        _get_collection().add(
+            ids=[uuid.uuid4().hex],
+            embeddings=get_chroma_service().embed_query(user_message),
+            documents=[response],
+            metadatas=[{"ctx_hash": ctx_hash, "user_id": _user_key(user_id), "created_at": time.time()}]
+        )
+    except Exception:
+        logger.warning("Error writing to the semantic cache", exc_info=True)
+
+
+def prune(max_age: Optional[float] = None) -> int:
+    """
+    Delete cached responses older than max_age seconds.
+
+    Args:
+        max_age: Maximum age to keep; defaults to CHAT_SEMANTIC_CACHE_TTL
+
+    Returns:
+        Number of entries deleted
+    """
+    if max_age is None:
+        max_age = settings.CHAT_SEMANTIC_CACHE_TTL
+    collection = _get_collection()
+    expired = collection.get(
+        where={"created_at": {"$lt": time.time() - max_age}},
+        include=[]
+    )
+    if expired['ids']:
+        collection.delete(ids=expired['ids'])
+    return len(expired['ids'])
@@ -11,20 +11,51 @@ class MessageSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_at')
 
 
+def _message_count(conversation):
+    """
+    Return the number of messages in a conversation, using the
+    Count('messages') annotation added by the views when present.
+    """
+    count = getattr(conversation, 'message_count', None)
+    if count is None:
+        count = conversation.messages.count()
+    return count
+
+
 class ConversationSerializer(serializers.ModelSerializer):
-    """Serializer for Conversation model."""
+    """
+    Serializer for Conversation model.
+    
+    Messages are only included when requested, either with ?expand=messages
+    or by passing expand_messages=True in the serializer context.
+    """
     messages = MessageSerializer(many=True, read_only=True)
-    message_count = serializers.IntegerField(source='messages.count', read_only=True)
+    message_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Conversation
         fields = ('id', 'title', 'created_at', 'updated_at', 'messages', 'message_count')
         read_only_fields = ('id', 'created_at', 'updated_at')
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._expand_messages():
+            fields.pop('messages')
+        return fields
+    
+    def _expand_messages(self):
+        if self.context.get('expand_messages'):
+            return True
+        request = self.context.get('request')
+        return request is not None and request.query_params.get('expand') == 'messages'
+    
+    def get_message_count(self, obj):
+        return _message_count(obj)
 
 
 class ConversationListSerializer(serializers.ModelSerializer):
     """Serializer for listing conversations without all messages."""
-    message_count = serializers.IntegerField(source='messages.count', read_only=True)
+    message_count = serializers.SerializerMethodField()
     last_message = serializers.SerializerMethodField()
     
     class Meta:
@@ -32,8 +63,24 @@ class ConversationListSerializer(serializers.ModelSerializer):
         fields = ('id', 'title', 'created_at', 'updated_at', 'message_count', 'last_message')
         read_only_fields = ('id', 'created_at', 'updated_at')
     
+    def get_message_count(self, obj):
+        return _message_count(obj)
+    
     def get_last_message(self, obj):
-        last_message = obj.messages.last()
+        # Use the last_message_* annotations when the view provides them (see
+        # ConversationListCreateView.get_queryset) to avoid a query per row;
+        # either way only the serialized columns are read, as a dict
+        if hasattr(obj, 'last_message_id'):
+            last_message = None
+            if obj.last_message_id is not None:
+                last_message = {
+                    'id': obj.last_message_id,
+                    'role': obj.last_message_role,
+                    'content': obj.last_message_content,
+                    'created_at': obj.last_message_created_at,
+                }
+        else:
+            last_message = obj.messages.values('id', 'role', 'content', 'created_at').last()
         if last_message:
             return MessageSerializer(last_message).data
         return None
@@ -1,6 +1,218 @@
 from huggingface_hub import InferenceClient
 from django.conf import settings
-from typing import Dict, List, Optional
+from django.core.cache import cache
+from django.db.models import Count
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import logging
+import random
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio used to estimate prompt size without loading
+# the chat model's tokenizer (errs on the side of overestimating for English text)
+CHARS_PER_TOKEN = 3
+
+
+def _estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a piece of text."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+# Maximum user/assistant turns of conversation history sent with a message
+MAX_HISTORY_TURNS = 8
+
+# Seconds a user's resolved HuggingFace API token is cached (see _get_api_token)
+HF_TOKEN_CACHE_TTL = 60
+
+# Seconds serialized products shown in chat are cached (see _load_products_data)
+PRODUCT_DATA_CACHE_TTL = 300
+
+# Reply length caps (max_tokens): messages asking for a brief answer get a low cap,
+# ones asking for depth (or deep dive mode) a high one. The brief cap is skipped for
+# reasoning models (HUGGINGFACE_REASONING_MODEL): their thinking counts toward
+# max_tokens, so a low cap would cut the reply off or leave it empty.
+MAX_TOKENS_BRIEF = 500
+MAX_TOKENS_DEFAULT = 2000
+MAX_TOKENS_DETAILED = 3000
+BRIEF_REQUEST_PATTERN = re.compile(
+    r'\b(short|brief|briefly|one line|one sentence|in a sentence|in a few words|tl;?dr|summari[sz]e|summary)\b',
+    re.IGNORECASE
+)
+DETAILED_REQUEST_PATTERN = re.compile(
+    r'\b(detailed|in detail|comprehensive|thorough|in depth|in-depth|step by step|at length|long answer|long explanation)\b',
+    re.IGNORECASE
+)
+
+
+def _max_tokens_for(user_message: str, deep_dive: bool, reasoning_model: bool) -> int:
+    """Choose max_tokens from deep dive mode and any length the message asks for."""
+    if deep_dive or DETAILED_REQUEST_PATTERN.search(user_message):
+        return MAX_TOKENS_DETAILED
+    if not reasoning_model and BRIEF_REQUEST_PATTERN.search(user_message):
+        return MAX_TOKENS_BRIEF
+    return MAX_TOKENS_DEFAULT
+
+
+# Greetings, thanks and other small talk that need no business/product context
+SMALL_TALK_PATTERN = re.compile(
+    r'^\W*(hi+|hello|hey+|yo|thanks?( you)?|thank u|thx|ty|ok(ay)?|k|cool|great|nice|bye|goodbye|lol|'
+    r'good (morning|afternoon|evening|night)|how are you)?\W*$',
+    re.IGNORECASE
+)
+
+
+# API errors whose message matches this are reported as token/authentication problems
+AUTH_ERROR_PATTERN = re.compile(r'token|auth|unauthorized|401|403', re.IGNORECASE)
+
+# Attempts made for a chat completion that fails with a transient error
+# (rate limiting or server errors), with exponential backoff plus jitter between them
+CHAT_COMPLETION_ATTEMPTS = 3
+RETRY_BACKOFF_BASE = 0.5
+RETRY_BACKOFF_JITTER = 0.2
+# Upper bound on a single wait, including waits asked for by the API
+# (Retry-After header or a loading model's estimated_time), so retries fit the client timeout
+RETRY_MAX_DELAY = 10.0
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Whether an API error (HfHubHTTPError) is transient."""
+    response = getattr(error, 'response', None)
+    status_code = getattr(response, 'status_code', None)
+    return status_code in RETRYABLE_STATUS_CODES
+
+
+def _requested_delay(error: Exception) -> Optional[float]:
+    """
+    Return how long the API asked us to wait before retrying, if it did: the
+    Retry-After header (in seconds), or the estimated_time of a 503 returned
+    while the model is loading.
+    """
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return float(response.json()['estimated_time'])
+    except Exception:
+        return None
+
+
+def _retry_delay(attempt: int, error: Exception) -> float:
+    """Seconds to wait before retrying after the given (0-based) failed attempt."""
+    delay = RETRY_BACKOFF_BASE * (2 ** attempt)
+    requested = _requested_delay(error)
+    if requested is not None:
+        delay = max(delay, requested)
+    return min(delay, RETRY_MAX_DELAY) + random.uniform(0, RETRY_BACKOFF_JITTER)
+
+
+# Worker threads for context searches that run alongside the request thread.
+# Each in-flight chat turn uses at most one worker, so the pool is sized by
+# CHAT_CONTEXT_SEARCH_WORKERS (at least the server's request threads per
+# process); below that, business searches queue behind other requests.
+# Threads are only started as they are needed.
+_context_executor = ThreadPoolExecutor(
+    max_workers=settings.CHAT_CONTEXT_SEARCH_WORKERS,
+    thread_name_prefix='chat-context'
+)
+
+
+@lru_cache(maxsize=64)
+def _get_client(model: str, token: Optional[str]) -> InferenceClient:
+    """Return the process-wide InferenceClient for a model and API token."""
+    return InferenceClient(model=model, token=token)
+
+
+# System prompt emphasizing no hallucination and response length limits.
+# Kept terse: it is sent (and tokenized) with every request.
+SYSTEM_PROMPT_DEFAULT = """You are Humanoid AI, an assistant whose core principle is "No Hallucination": be accurate and fact-based, never invent information, and clearly say when you are unsure or do not know.
+
+Be helpful, professional and concise: at most 10 lines, unless the user asks for a specific length or a detailed answer.
+
+Product and business information in your context is shown to the user with its images automatically. Describe those items naturally; never say you cannot show or share images."""
+
+# System prompt for deep dive mode (detailed, comprehensive answers)
+SYSTEM_PROMPT_DEEP_DIVE = """You are Humanoid AI, an advanced AI assistant with the core principle of "No Hallucination". 
+
+DEEP DIVE MODE IS ENABLED - You should think deeply and provide comprehensive, detailed responses.
+
+Your responses must be:
+- Accurate and fact-based
+- Honest about limitations and uncertainties
+- Clear when you don't know something
+- Free from made-up information or false claims
+- Detailed, thorough, and comprehensive
+- Well-structured with clear explanations
+- Include reasoning, examples, and multiple perspectives when relevant
+
+In Deep Dive mode:
+- Take time to think through the question carefully
+- Provide detailed explanations with context
+- Include examples, analogies, or step-by-step breakdowns
+- Consider multiple angles and perspectives
+- Elaborate on key concepts
+- You may write longer responses (no strict line limit, but stay focused)
+
+IMPORTANT: When you receive product or business information in your context:
+- Product images are automatically displayed to users alongside your responses
+- DO NOT say you cannot show, display, or share images
+- Simply describe the products/businesses naturally and in detail
+- The visual content is handled by the system automatically
+
+If you're unsure about something, clearly state your uncertainty rather than guessing or fabricating information."""
+
+
+# Templates for the business and product context messages
+BUSINESS_CONTEXT_HEADER = """
+--- RELEVANT BUSINESS INFORMATION ---
+The following businesses may be relevant to the user's query:
+"""
+BUSINESS_CONTEXT_ITEM = """
+
+Business {i} (Owner: {owner}):
+{info}
+---"""
+BUSINESS_CONTEXT_FOOTER = """
+
+If the user's query is related to any of these businesses, include relevant information in your response.
+If not related, ignore this context and respond to the user's query normally.
+--- END OF BUSINESS INFORMATION ---
+"""
+
+PRODUCT_CONTEXT_HEADER = """
+--- RELEVANT PRODUCT INFORMATION ---
+The following products may be relevant to the user's query:
+"""
+PRODUCT_CONTEXT_ITEM = """
+
+Product {i} (Business Owner: {owner}):
+{description}{details}
+---"""
+PRODUCT_CONTEXT_BUSINESS = """
+Owner Company: {owner}
+Business Details: {info}"""
+PRODUCT_CONTEXT_IMAGES = """
+Images: This product has {count} image(s) available."""
+PRODUCT_CONTEXT_FOOTER = """
+
+IMPORTANT INSTRUCTIONS FOR HANDLING PRODUCTS:
+- If the user's query is related to any of these products, include relevant product information in your response.
+- The product images ARE AUTOMATICALLY DISPLAYED to the user alongside your message.
+- DO NOT say you cannot display or share images - they are already visible to the user.
+- Simply describe the products naturally and mention details like name, price, and specifications.
+- You can say things like 'Here are the products' or 'I found these items for you' or 'Check out these options'.
+- The images with full product details are shown in product cards next to your response.
+- If not related to the query, ignore this context and respond normally.
+--- END OF PRODUCT INFORMATION ---
+"""
 
 
 class HuggingFaceService:
@@ -9,6 +221,26 @@ class HuggingFaceService:
     Using Qwen/Qwen3-235B-A22B model for chat completion.
     """
     
+    # System prompt messages by deep dive mode, built once and shared by every request
+    _SYSTEM_PROMPTS = {
+        False: SYSTEM_PROMPT_DEFAULT,
+        True: SYSTEM_PROMPT_DEEP_DIVE,
+    }
+    _SYSTEM_MESSAGES = {
+        deep_dive: {"role": "system", "content": prompt}
+        for deep_dive, prompt in _SYSTEM_PROMPTS.items()
+    }
+    # Same prompts as a content block marked for provider-side prompt caching
+    # (HUGGINGFACE_PROMPT_CACHE_CONTROL); only for models whose chat template
+    # renders list content, which Qwen3's does not
+    _CACHEABLE_SYSTEM_MESSAGES = {
+        deep_dive: {
+            "role": "system",
+            "content": [{"type": "text", "text": prompt, "cache_control": {"type": "ephemeral"}}],
+        }
+        for deep_dive, prompt in _SYSTEM_PROMPTS.items()
+    }
+    
     def __init__(self, user=None):
         """
         Initialize the HuggingFace service.
@@ -23,59 +255,52 @@ class HuggingFaceService:
         self.api_token = self._get_api_token()
         
         # Use the Hugging Face InferenceClient for Chat Completion API
-        self.client = InferenceClient(
-            model=self.model,
-            token=self.api_token
-        )
+        # (shared per model and token so connections are reused across requests)
+        self.client = _get_client(self.model, self.api_token)
         
         # Store relevant products found during context search
         self.relevant_products = []
-        
-        # System prompt emphasizing no hallucination and response length limits
-        self.system_prompt = """You are Humanoid AI, an advanced AI assistant with the core principle of "No Hallucination". 
-
-Your responses must be:
-- Accurate and fact-based
-- Honest about limitations and uncertainties
-- Clear when you don't know something
-- Free from made-up information or false claims
-- Helpful, professional, and concise
-- LIMITED TO 5 LINES MAXIMUM unless the user explicitly requests more lines or a longer response
-
-IMPORTANT RESPONSE LENGTH RULE:
-- By default, keep your response to 10 lines or less (approximately 10 lines of text)
-- If the user asks for a specific number of lines, honor their request
-- If the user asks for a detailed, long, or comprehensive answer, you may exceed 10 lines
-- Otherwise, always keep responses concise and within 10 lines
-
-IMPORTANT: When you receive product or business information in your context:
-- Product images are automatically displayed to users alongside your responses
-- DO NOT say you cannot show, display, or share images
-- Simply describe the products/businesses naturally
-- The visual content is handled by the system automatically
-
-If you're unsure about something, clearly state your uncertainty rather than guessing or fabricating information."""
+        self._relevant_product_ids = []
     
     def _get_api_token(self):
         """
         Get the appropriate HuggingFace API token for the user.
         Uses assigned token if available, otherwise falls back to settings.
+        
+        The assigned token is cached per user for HF_TOKEN_CACHE_TTL seconds;
+        accounts.signals drops the entry when the user's assignment or token changes.
+        That only reaches other worker processes when CACHES is a shared backend;
+        with the default per-process cache they can use the old token for up to
+        HF_TOKEN_CACHE_TTL seconds.
         """
         if self.user:
             from accounts.models import UserHFTokenAssignment
             
-            # Get the active assignment for this user
-            assignment = UserHFTokenAssignment.objects.filter(
-                user=self.user,
-                is_active=True
-            ).select_related('hf_token').first()
-            
-            if assignment and assignment.hf_token.is_active:
-                return assignment.hf_token.token
+            token = cache.get_or_set(
+                UserHFTokenAssignment.token_cache_key(self.user.id),
+                self._get_assigned_token,
+                HF_TOKEN_CACHE_TTL
+            )
+            if token:
+                return token
         
         # Fallback to settings token
         return settings.HUGGINGFACE_API_TOKEN
     
+    def _get_assigned_token(self) -> Optional[str]:
+        """Look up the token of the user's active assignment, if any."""
+        from accounts.models import UserHFTokenAssignment
+        
+        # Get the active assignment for this user
+        assignment = UserHFTokenAssignment.objects.filter(
+            user=self.user,
+            is_active=True
+        ).select_related('hf_token').first()
+        
+        if assignment and assignment.hf_token.is_active:
+            return assignment.hf_token.token
+        return None
+    
     def generate_response(
         self,
         user_message: str,
@@ -86,6 +311,9 @@ If you're unsure about something, clearly state your uncertainty rather than gue
         Generate a response using the Hugging Face Chat Completion API.
         Searches for relevant business information in ChromaDB and includes it in context.
         
+        Blocking wrapper around generate_response_stream() for callers that
+        need the whole reply at once.
+        
         Args:
             user_message: The user's message
             conversation_history: Previous messages in the conversation
@@ -94,206 +322,392 @@ If you're unsure about something, clearly state your uncertainty rather than gue
         Returns:
             The AI's response text
         """
-        # Search for relevant business and product information in ChromaDB
-        business_context = self._get_business_context(user_message)
-        product_context = self._get_product_context(user_message)
+        response_text = "".join(
+            self.generate_response_stream(user_message, conversation_history, deep_dive)
+        ).strip()
         
-        # Choose system prompt based on deep dive mode
-        if deep_dive:
-            system_prompt = """You are Humanoid AI, an advanced AI assistant with the core principle of "No Hallucination". 
-
-DEEP DIVE MODE IS ENABLED - You should think deeply and provide comprehensive, detailed responses.
-
-Your responses must be:
-- Accurate and fact-based
-- Honest about limitations and uncertainties
-- Clear when you don't know something
-- Free from made-up information or false claims
-- Detailed, thorough, and comprehensive
-- Well-structured with clear explanations
-- Include reasoning, examples, and multiple perspectives when relevant
-
-In Deep Dive mode:
-- Take time to think through the question carefully
-- Provide detailed explanations with context
-- Include examples, analogies, or step-by-step breakdowns
-- Consider multiple angles and perspectives
-- Elaborate on key concepts
-- You may write longer responses (no strict line limit, but stay focused)
-
-IMPORTANT: When you receive product or business information in your context:
-- Product images are automatically displayed to users alongside your responses
-- DO NOT say you cannot show, display, or share images
-- Simply describe the products/businesses naturally and in detail
-- The visual content is handled by the system automatically
-
-If you're unsure about something, clearly state your uncertainty rather than guessing or fabricating information."""
-        else:
-            system_prompt = self.system_prompt
-        
-        # Build messages list for Chat Completion API
-        messages = [{"role": "system", "content": system_prompt}]
-        
-        # Add business context if found
-        if business_context:
-            messages.append({"role": "system", "content": business_context})
-        
-        # Add product context if found
-        if product_context:
-            messages.append({"role": "system", "content": product_context})
+        if not response_text:
+            logger.error("HuggingFace API Error: empty response")
+            raise Exception("Something went wrong! Try Again! Send another message!")
         
-        # Add conversation history if exists
-        if conversation_history:
-            messages.extend(conversation_history)
+        return response_text
+    
+    def generate_response_stream(
+        self,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        deep_dive: bool = False
+    ) -> Iterator[str]:
+        """
+        Generate a response using the Hugging Face Chat Completion API,
+        yielding text chunks as the model produces them.
         
-        # Add current user message
-        messages.append({"role": "user", "content": user_message})
+        Context search runs when iteration starts; relevant_products is
+        populated once the whole response has been generated.
         
-        # Adjust parameters based on deep dive mode
-        max_tokens = 3000 if deep_dive else 2000
-        temperature = 0.8 if deep_dive else 0.7
+        Args:
+            user_message: The user's message
+            conversation_history: Previous messages in the conversation
+            deep_dive: If True, enables deep thinking mode with detailed analysis
+            
+        Yields:
+            Pieces of the AI's response text
+        """
+        request, cache_key, cached_response = self._prepare_request(user_message, conversation_history, deep_dive)
+        if cached_response is not None:
+            yield cached_response
+            self._hydrate_relevant_products()
+            return
         
         try:
-            # Use the InferenceClient's chat_completion method
-            response = self.client.chat_completion(
-                messages=messages,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                top_p=0.95,
-                stream=False
-            )
-            
-            # Extract the response content
-            if response and hasattr(response, 'choices') and len(response.choices) > 0:
-                message_content = response.choices[0].message.content
-                return message_content.strip()
+            # Use the InferenceClient's chat_completion method in streaming mode
+            stream = self._create_completion(request, stream=True)
             
-            # Fallback error handling
-            raise Exception(f"Unexpected API response format: {response}")
+            chunks = []
+            for chunk in stream:
+                # Some providers send a final usage-only chunk without choices
+                if chunk.choices:
+                    content = chunk.choices[0].delta.content
+                    if content:
+                        chunks.append(content)
+                        yield content
             
         except Exception as e:
-            # Log the actual error for debugging (only in development)
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"HuggingFace API Error: {str(e)}")
+            raise self._masked_error(e)
+        
+        # Serialize the matched products (with images) only now, so it does not
+        # delay the first chunk
+        self._hydrate_relevant_products()
+        
+        if cache_key is not None:
+            from . import semantic_cache
+            semantic_cache.store(user_message, cache_key, "".join(chunks).strip(), self._user_id)
+    
+    def _create_completion(self, request: Dict, stream: bool = False):
+        """Call chat_completion, retrying transient API errors with backoff."""
+        for attempt in range(CHAT_COMPLETION_ATTEMPTS):
+            try:
+                return self.client.chat_completion(**request, stream=stream)
+            except Exception as e:
+                if attempt == CHAT_COMPLETION_ATTEMPTS - 1 or not _is_retryable(e):
+                    raise
+                delay = _retry_delay(attempt, e)
+                logger.warning("Transient HuggingFace API error, retrying in %.2fs: %s", delay, e)
+                time.sleep(delay)
+    
+    @property
+    def _user_id(self) -> Optional[int]:
+        """Id of the requesting user, scoping their semantic cache entries."""
+        return self.user.id if self.user is not None else None
+    
+    def _prepare_request(
+        self,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]],
+        deep_dive: bool
+    ) -> Tuple[Dict, Optional[str], Optional[str]]:
+        """
+        Search for context and build the chat_completion arguments for a message.
+        
+        Returns:
+            (request, cache_key, cached_response): request holds the messages,
+            max_tokens, temperature and top_p arguments; cache_key is the semantic
+            cache key to store the response under (None when the cache is
+            disabled); cached_response is set on a semantic cache hit.
+        """
+        # Search for relevant business and product information in ChromaDB.
+        # The business search (ChromaDB only) runs on a worker thread while the
+        # product search, which also queries the database, runs on this one:
+        # Django connections are per thread, so the ORM work stays here.
+        # The message is embedded once here and the vector shared by both searches.
+        business_context = product_context = ""
+        # Small talk ("hi", "thanks") skips the searches altogether
+        needs_context = not SMALL_TALK_PATTERN.match(user_message)
+        if needs_context:
+            query_embedding = self._embed_query(user_message)
+            business_future = _context_executor.submit(self._get_business_context, user_message, query_embedding)
+            product_context = self._get_product_context(user_message, query_embedding)
+            business_context = business_future.result()
+        
+        # Business and product context (only the ones that were found)
+        contexts = [context for context in (business_context, product_context) if context]
+        
+        # Adjust parameters based on deep dive mode and the requested reply length
+        max_tokens = _max_tokens_for(user_message, deep_dive, settings.HUGGINGFACE_REASONING_MODEL)
+        temperature = 0.8 if deep_dive else 0.7
+        
+        # Fit the prompt plus the reply in the model's context window: drop
+        # retrieved context that alone would overflow it (products first), then
+        # trim the oldest history to the remaining budget
+        if settings.HUGGINGFACE_PROMPT_CACHE_CONTROL:
+            system_message = self._CACHEABLE_SYSTEM_MESSAGES[bool(deep_dive)]
+        else:
+            system_message = self._SYSTEM_MESSAGES[bool(deep_dive)]
+        prompt_budget = settings.HUGGINGFACE_CONTEXT_WINDOW - max_tokens
+        fixed_tokens = _estimate_tokens(self._SYSTEM_PROMPTS[bool(deep_dive)]) + _estimate_tokens(user_message)
+        context_tokens = [_estimate_tokens(context) for context in contexts]
+        while contexts and fixed_tokens + sum(context_tokens) > prompt_budget:
+            contexts.pop()
+            context_tokens.pop()
+        fixed_tokens += sum(context_tokens)
+        history = self._truncate_history(
+            (conversation_history or [])[-MAX_HISTORY_TURNS * 2:],
+            prompt_budget - fixed_tokens
+        )
+        
+        # All retrieved context goes in one system message to save per-message framing tokens
+        context_messages = [{"role": "system", "content": "\n".join(contexts)}] if contexts else []
+        late_context_messages = context_messages
+        if context_messages and not settings.HUGGINGFACE_LATE_SYSTEM_MESSAGE:
+            # The model's chat template only accepts a leading system message
+            system_message = self._with_context(system_message, context_messages[0]["content"])
+            late_context_messages = []
+        
+        # Build messages list for Chat Completion API in a single preallocated list:
+        # system prompt (by deep dive mode), conversation history, context, current
+        # user message. The per-message context comes after the history so the
+        # prompt prefix stays the same across turns and providers can reuse its KV cache
+        messages = [None] * (2 + len(history) + len(late_context_messages))
+        messages[0] = system_message
+        context_start = 1 + len(history)
+        messages[1:context_start] = history
+        messages[context_start:context_start + len(late_context_messages)] = late_context_messages
+        messages[-1] = {"role": "user", "content": user_message}
+        
+        # Serve a cached response for a near-identical message asked with the same context
+        cache_key = None
+        cached_response = None
+        if settings.CHAT_SEMANTIC_CACHE:
+            from . import semantic_cache
+            cache_key = semantic_cache.context_hash(self._user_id, history, context_messages, deep_dive)
+            cached_response = semantic_cache.lookup(user_message, cache_key, self._user_id)
+        
+        request = {
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "top_p": 0.95,
+        }
+        return request, cache_key, cached_response
+    
+    @staticmethod
+    def _truncate_history(history: List[Dict[str, str]], token_budget: int) -> List[Dict[str, str]]:
+        """
+        Keep the most recent messages of a conversation that fit in a token budget.
+        
+        The latest user/assistant pair is always kept so follow-up questions
+        keep their immediate context.
+        
+        Args:
+            history: Conversation messages, oldest first
+            token_budget: Estimated tokens available for the history
             
-            # Check if it's an authentication/token error
-            error_str = str(e).lower()
-            if any(keyword in error_str for keyword in ['token', 'auth', 'unauthorized', '401', '403']):
-                error_msg = "Invalid HuggingFace API token. Please contact the administrator to add a valid token in Settings."
-            else:
-                # Generic error message to mask the underlying API provider
-                error_msg = "Something went wrong! Try Again! Send another message!"
-            raise Exception(error_msg)
+        Returns:
+            The retained messages, oldest first
+        """
+        kept = 0
+        used = 0
+        for message in reversed(history):
+            used += _estimate_tokens(message["content"])
+            if used > token_budget and kept >= 2:
+                break
+            kept += 1
+        return history[len(history) - kept:]
     
-    def _get_business_context(self, query: str) -> str:
+    def _masked_error(self, error: Exception) -> Exception:
+        """
+        Log an API error and return an exception carrying a user-facing message
+        that does not expose the underlying API provider.
+        """
+        # Log the actual error for debugging (only in development)
+        logger.error("HuggingFace API Error: %s", error)
+        
+        # Check if it's an authentication/token error
+        if AUTH_ERROR_PATTERN.search(str(error)):
+            error_msg = "Invalid HuggingFace API token. Please contact the administrator to add a valid token in Settings."
+        else:
+            # Generic error message to mask the underlying API provider
+            error_msg = "Something went wrong! Try Again! Send another message!"
+        return Exception(error_msg)
+    
+    @staticmethod
+    def _with_context(system_message: Dict, context: str) -> Dict:
+        """Return a copy of a system message with the retrieved context appended."""
+        content = system_message["content"]
+        if isinstance(content, list):
+            content = content + [{"type": "text", "text": context}]
+        else:
+            content = f"{content}\n\n{context}"
+        return {"role": "system", "content": content}
+    
+    def _embed_query(self, query: str) -> Optional[np.ndarray]:
+        """
+        Embed the user's query for the context searches.
+        
+        Returns None if the embedding model is unavailable; each search then
+        handles the failure itself.
+        """
+        try:
+            from .chroma_service import get_chroma_service
+            return get_chroma_service().embed_query(query)
+        except Exception:
+            logger.warning("Error embedding query for context search", exc_info=True)
+            return None
+    
+    def _get_business_context(self, query: str, query_embedding: Optional[np.ndarray] = None) -> str:
         """
         Search for relevant business information in ChromaDB based on the query.
         
         Args:
             query: The user's query
+            query_embedding: Precomputed embedding of the query, if available
             
         Returns:
             Formatted business context string or empty string
         """
         try:
-            from .chroma_service import chroma_service
+            from .chroma_service import get_chroma_service
             
             # Search for relevant businesses (will return up to 3, or fewer if not enough exist)
-            results = chroma_service.search_businesses(query, n_results=3)
+            results = get_chroma_service().search_businesses(
+                query, n_results=3, query_embedding=query_embedding
+            )
             
             if not results or len(results) == 0:
                 return ""
             
             # Format business information for the AI
-            context_parts = ["\n--- RELEVANT BUSINESS INFORMATION ---"]
-            context_parts.append("The following businesses may be relevant to the user's query:\n")
-            
-            for i, business in enumerate(results, 1):
-                context_parts.append(f"\nBusiness {i} (Owner: {business.get('username', 'Unknown')}):")
-                context_parts.append(business.get('business_info', 'No information available'))
-                context_parts.append("---")
-            
-            context_parts.append("\nIf the user's query is related to any of these businesses, include relevant information in your response.")
-            context_parts.append("If not related, ignore this context and respond to the user's query normally.")
-            context_parts.append("--- END OF BUSINESS INFORMATION ---\n")
-            
-            return "\n".join(context_parts)
-        except Exception as e:
-            print(f"Error getting business context: {e}")
+            return BUSINESS_CONTEXT_HEADER + "".join(
+                BUSINESS_CONTEXT_ITEM.format(
+                    i=i,
+                    owner=business.get('username', 'Unknown'),
+                    info=business.get('business_info', 'No information available')
+                )
+                for i, business in enumerate(results, 1)
+            ) + BUSINESS_CONTEXT_FOOTER
+        except Exception:
+            logger.warning("Error getting business context", exc_info=True)
             return ""
     
-    def _get_product_context(self, query: str) -> str:
+    def _get_product_context(self, query: str, query_embedding: Optional[np.ndarray] = None) -> str:
         """
         Search for relevant product information in ChromaDB based on the query.
         
         Args:
             query: The user's query
+            query_embedding: Precomputed embedding of the query, if available
             
         Returns:
             Formatted product context string or empty string
         """
         try:
-            from .chroma_service import chroma_service
-            from accounts.models_product import Product
-            from accounts.serializers_product import ProductSerializer
+            from .chroma_service import get_chroma_service
             
             # Reset relevant products for this query
             self.relevant_products = []
+            self._relevant_product_ids = []
             
             # Search for relevant products (will return up to 5, or fewer if not enough exist)
-            results = chroma_service.search_products(query, n_results=5)
+            results = get_chroma_service().search_products(
+                query, n_results=5, query_embedding=query_embedding
+            )
             
             if not results or len(results) == 0:
                 return ""
             
-            # Format product information for the AI
-            context_parts = ["\n--- RELEVANT PRODUCT INFORMATION ---"]
-            context_parts.append("The following products may be relevant to the user's query:\n")
+            products_facts = self._load_product_facts(
+                [product['product_db_id'] for product in results if product.get('product_db_id')]
+            )
             
+            # Format product information for the AI
+            items = []
             for i, product in enumerate(results, 1):
-                context_parts.append(f"\nProduct {i} (Business Owner: {product.get('username', 'Unknown')}):")
-                context_parts.append(product.get('product_description', 'No information available'))
+                details = ""
                 
-                # Get product images and business info if product_db_id is available
-                product_db_id = product.get('product_db_id')
-                if product_db_id:
-                    try:
-                        product_obj = Product.objects.select_related('business', 'business__user').prefetch_related('images').get(id=product_db_id)
-                        image_count = product_obj.images.count()
-                        
-                        # Add business info to context
-                        if product_obj.business:
-                            business = product_obj.business
-                            context_parts.append(f"Owner Company: {business.user.username}")
-                            context_parts.append(f"Business Details: {business.business_info}")
-                        
-                        if image_count > 0:
-                            context_parts.append(f"Images: This product has {image_count} image(s) available.")
-                            
-                            # Store product data for response (includes business_info via serializer)
-                            serializer = ProductSerializer(product_obj)
-                            self.relevant_products.append(serializer.data)
-                        else:
-                            # Still include products without images but with business info
-                            serializer = ProductSerializer(product_obj)
-                            self.relevant_products.append(serializer.data)
-                    except Product.DoesNotExist:
-                        pass
+                # Add images and business info if the product still exists
+                product_facts = products_facts.get(product.get('product_db_id'))
+                if product_facts:
+                    details += PRODUCT_CONTEXT_BUSINESS.format(
+                        owner=product_facts['business__user__username'],
+                        info=product_facts['business__business_info'] or ""
+                    )
+                    if product_facts['images_count'] > 0:
+                        details += PRODUCT_CONTEXT_IMAGES.format(count=product_facts['images_count'])
+                    
+                    # Included in the response, with or without images, once
+                    # serialized by _hydrate_relevant_products
+                    self._relevant_product_ids.append(product_facts['id'])
                 
-                context_parts.append("---")
-            
-            context_parts.append("\nIMPORTANT INSTRUCTIONS FOR HANDLING PRODUCTS:")
-            context_parts.append("- If the user's query is related to any of these products, include relevant product information in your response.")
-            context_parts.append("- The product images ARE AUTOMATICALLY DISPLAYED to the user alongside your message.")
-            context_parts.append("- DO NOT say you cannot display or share images - they are already visible to the user.")
-            context_parts.append("- Simply describe the products naturally and mention details like name, price, and specifications.")
-            context_parts.append("- You can say things like 'Here are the products' or 'I found these items for you' or 'Check out these options'.")
-            context_parts.append("- The images with full product details are shown in product cards next to your response.")
-            context_parts.append("- If not related to the query, ignore this context and respond normally.")
-            context_parts.append("--- END OF PRODUCT INFORMATION ---\n")
+                items.append(PRODUCT_CONTEXT_ITEM.format(
+                    i=i,
+                    owner=product.get('username', 'Unknown'),
+                    description=product.get('product_description', 'No information available'),
+                    details=details
+                ))
             
-            return "\n".join(context_parts)
-        except Exception as e:
-            print(f"Error getting product context: {e}")
+            return PRODUCT_CONTEXT_HEADER + "".join(items) + PRODUCT_CONTEXT_FOOTER
+        except Exception:
+            logger.warning("Error getting product context", exc_info=True)
             return ""
+    
+    @staticmethod
+    def _load_product_facts(product_ids: List[int]) -> Dict[int, Dict]:
+        """
+        Return the product details used in the prompt (owner, business info and
+        image count) by id, without loading image data. Missing products are left out.
+        """
+        from accounts.models_product import Product
+        
+        products = Product.objects.filter(id__in=product_ids).annotate(
+            images_count=Count('images')
+        ).values('id', 'business__user__username', 'business__business_info', 'images_count')
+        return {product['id']: product for product in products}
+    
+    def _hydrate_relevant_products(self) -> None:
+        """Serialize the products matched by the last context search into relevant_products."""
+        try:
+            products_data = self._load_products_data(self._relevant_product_ids)
+            self.relevant_products = [
+                products_data[product_id] for product_id in self._relevant_product_ids
+                if product_id in products_data
+            ]
+        except Exception:
+            logger.warning("Error loading relevant products", exc_info=True)
+            self.relevant_products = []
+    
+    @staticmethod
+    def _load_products_data(product_ids: List[int]) -> Dict[int, Dict]:
+        """
+        Return serialized products (ProductSerializer data) by id.
+        
+        Serialized products are cached for PRODUCT_DATA_CACHE_TTL seconds, so
+        products that keep matching chat queries skip both loading their images
+        and re-serializing; accounts.signals drops an entry when the product,
+        its images or its business change (in every worker process only when
+        CACHES is a shared backend, otherwise other processes may show the old
+        data for up to PRODUCT_DATA_CACHE_TTL seconds). Missing products are
+        left out.
+        """
+        from accounts.models_product import Product
+        from accounts.serializers_product import product_to_dict
+        
+        cache_keys = {product_id: Product.data_cache_key(product_id) for product_id in product_ids}
+        cached = cache.get_many(cache_keys.values())
+        products_data = {
+            product_id: cached[key] for product_id, key in cache_keys.items() if key in cached
+        }
+        
+        # Load the remaining products (with business, owner and images) in one go
+        missing_ids = [product_id for product_id in product_ids if product_id not in products_data]
+        if missing_ids:
+            loaded = Product.objects.select_related(
+                'business', 'business__user'
+            ).prefetch_related('images').in_bulk(missing_ids)
+            for product_id, product_obj in loaded.items():
+                products_data[product_id] = product_to_dict(product_obj)
+            cache.set_many(
+                {cache_keys[product_id]: products_data[product_id] for product_id in loaded},
+                PRODUCT_DATA_CACHE_TTL
+            )
+        
+        return products_data
@@ -0,0 +1,50 @@
+"""
+Background tasks that keep ChromaDB in sync with the database.
+
+ChromaDB writes run an embedding forward pass plus an HNSW insert, which is
+too slow for the HTTP request path. These helpers queue the write on a
+per-process background thread once the surrounding database transaction
+has committed, so the response returns as soon as the database work is done.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from django.db import transaction
+from .chroma_service import get_chroma_service
+
+logger = logging.getLogger(__name__)
+
+# A single worker keeps writes in submission order (e.g. update then delete)
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chroma-writer')
+
+
+def _run(method_name, *args):
+    """Call a ChromaDBService method, logging (not raising) any failure."""
+    try:
+        getattr(get_chroma_service(), method_name)(*args)
+    except Exception:
+        logger.exception("ChromaDB background task %s failed", method_name)
+
+
+def _enqueue(method_name, *args):
+    """Run a ChromaDBService method in the background after the current transaction commits."""
+    transaction.on_commit(lambda: _executor.submit(_run, method_name, *args))
+
+
+def chroma_upsert_business(business_id: str, business_info: str, username: str):
+    """Queue an add/update of a business in ChromaDB."""
+    _enqueue('add_business', business_id, business_info, username)
+
+
+def chroma_delete_business(business_id: str):
+    """Queue removal of a business from ChromaDB."""
+    _enqueue('delete_business', business_id)
+
+
+def chroma_upsert_product(product_id: str, product_description: str, business_id: int, username: str, product_db_id: int = None):
+    """Queue an add/update of a product in ChromaDB."""
+    _enqueue('add_product', product_id, product_description, business_id, username, product_db_id)
+
+
+def chroma_delete_product(product_id: str):
+    """Queue removal of a product from ChromaDB."""
+    _enqueue('delete_product', product_id)
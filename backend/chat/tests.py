@@ -0,0 +1,151 @@
+from unittest import mock
+
+import numpy as np
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from . import semantic_cache
+from .services import (
+    MAX_TOKENS_BRIEF, MAX_TOKENS_DEFAULT, MAX_TOKENS_DETAILED, HuggingFaceService, _max_tokens_for,
+)
+
+
+class FakeCacheCollection:
+    """In-memory stand-in for the chat_semcache ChromaDB collection."""
+
+    def __init__(self):
+        self.entries = []
+
+    def add(self, ids, embeddings, documents, metadatas):
+        self.entries.extend(zip(documents, metadatas))
+
+    def query(self, query_embeddings, n_results, where, include):
+        # Every stored message embeds identically here, so any entry passing
+        # the metadata filter is a perfect similarity match
+        conditions = where.get("$and", [where])
+        for document, metadata in self.entries:
+            if all(metadata.get(key) == value for condition in conditions for key, value in condition.items()):
+                return {'ids': [['hit']], 'documents': [[document]], 'metadatas': [[metadata]], 'distances': [[0.0]]}
+        return {'ids': [[]], 'documents': [[]], 'metadatas': [[]], 'distances': [[]]}
+
+
+@override_settings(CHAT_SEMANTIC_CACHE=True)
+class SemanticCacheScopeTests(TestCase):
+    """Cached responses must never be served across users or differing histories."""
+
+    def setUp(self):
+        cache.clear()
+        collection = FakeCacheCollection()
+        chroma_service = mock.Mock(embed_query=mock.Mock(return_value=np.ones((1, 3), dtype=np.float32)))
+        for target, value in (
+            ('chat.semantic_cache._get_collection', lambda: collection),
+            ('chat.semantic_cache.get_chroma_service', lambda: chroma_service),
+            ('chat.services.HuggingFaceService._embed_query', lambda service, query: None),
+            ('chat.services.HuggingFaceService._get_business_context', lambda service, *args: ""),
+            ('chat.services.HuggingFaceService._get_product_context', lambda service, *args: ""),
+        ):
+            patcher = mock.patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        User = get_user_model()
+        self.alice = User.objects.create_user(username='alice', email='alice@example.com', password='pw-alice-1')
+        self.bob = User.objects.create_user(username='bob', email='bob@example.com', password='pw-bob-1')
+
+    @staticmethod
+    def _history(first_message):
+        """Six messages that only differ in the first one."""
+        history = [{'role': 'user', 'content': first_message}, {'role': 'assistant', 'content': 'Noted.'}]
+        for turn in range(2):
+            history.append({'role': 'user', 'content': f'Question {turn}'})
+            history.append({'role': 'assistant', 'content': f'Answer {turn}'})
+        return history
+
+    def _ask(self, user, history):
+        """Return (cache_key, cached_response) for the same question with the given history."""
+        _, cache_key, cached_response = HuggingFaceService(user=user)._prepare_request(
+            'What is my name?', history, False
+        )
+        return cache_key, cached_response
+
+    def test_other_user_with_different_early_history_misses(self):
+        cache_key, cached_response = self._ask(self.alice, self._history('My name is Alice.'))
+        self.assertIsNone(cached_response)
+        semantic_cache.store('What is my name?', cache_key, 'Your name is Alice.', self.alice.id)
+
+        _, cached_response = self._ask(self.bob, self._history('My name is Bob.'))
+        self.assertIsNone(cached_response)
+
+    def test_other_user_with_identical_history_misses(self):
+        history = self._history('Hello.')
+        cache_key, _ = self._ask(self.alice, history)
+        semantic_cache.store('What is my name?', cache_key, 'Your name is Alice.', self.alice.id)
+
+        _, cached_response = self._ask(self.bob, history)
+        self.assertIsNone(cached_response)
+
+    def test_same_user_different_early_history_misses(self):
+        cache_key, _ = self._ask(self.alice, self._history('My name is Alice.'))
+        semantic_cache.store('What is my name?', cache_key, 'Your name is Alice.', self.alice.id)
+
+        _, cached_response = self._ask(self.alice, self._history('Call me Al.'))
+        self.assertIsNone(cached_response)
+
+    def test_same_user_same_history_hits(self):
+        history = self._history('My name is Alice.')
+        cache_key, _ = self._ask(self.alice, history)
+        semantic_cache.store('What is my name?', cache_key, 'Your name is Alice.', self.alice.id)
+
+        _, cached_response = self._ask(self.alice, history)
+        self.assertEqual(cached_response, 'Your name is Alice.')
+
+
+class MaxTokensTests(SimpleTestCase):
+    """Reply length caps must leave reasoning models room to think and answer."""
+
+    def test_default_cap(self):
+        self.assertEqual(_max_tokens_for('What do you sell?', False, True), MAX_TOKENS_DEFAULT)
+        self.assertEqual(_max_tokens_for('What do you sell?', False, False), MAX_TOKENS_DEFAULT)
+
+    def test_detailed_request_and_deep_dive_get_detailed_cap(self):
+        self.assertEqual(_max_tokens_for('Explain it step by step', False, True), MAX_TOKENS_DETAILED)
+        self.assertEqual(_max_tokens_for('Give me a short answer', True, False), MAX_TOKENS_DETAILED)
+
+    def test_brief_request_caps_non_reasoning_model(self):
+        self.assertEqual(_max_tokens_for('Give me a short answer', False, False), MAX_TOKENS_BRIEF)
+
+    def test_brief_request_keeps_default_cap_for_reasoning_model(self):
+        self.assertEqual(_max_tokens_for('Give me a short answer', False, True), MAX_TOKENS_DEFAULT)
+
+
+class ContextMessageTests(TestCase):
+    """Retrieved context goes after the history only for templates that accept it."""
+
+    def setUp(self):
+        for target, value in (
+            ('chat.services.HuggingFaceService._embed_query', lambda service, query: None),
+            ('chat.services.HuggingFaceService._get_business_context', lambda service, *args: "Business: Acme"),
+            ('chat.services.HuggingFaceService._get_product_context', lambda service, *args: ""),
+        ):
+            patcher = mock.patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.history = [{'role': 'user', 'content': 'Hello there.'}, {'role': 'assistant', 'content': 'Hi!'}]
+
+    def _messages(self):
+        request, _, _ = HuggingFaceService()._prepare_request('What does Acme sell?', self.history, False)
+        return request['messages']
+
+    @override_settings(HUGGINGFACE_LATE_SYSTEM_MESSAGE=True)
+    def test_context_follows_history(self):
+        messages = self._messages()
+        self.assertEqual([message['role'] for message in messages], ['system', 'user', 'assistant', 'system', 'user'])
+        self.assertEqual(messages[3]['content'], 'Business: Acme')
+
+    @override_settings(HUGGINGFACE_LATE_SYSTEM_MESSAGE=False, HUGGINGFACE_PROMPT_CACHE_CONTROL=False)
+    def test_context_merged_into_leading_system_message(self):
+        messages = self._messages()
+        self.assertEqual([message['role'] for message in messages], ['system', 'user', 'assistant', 'user'])
+        self.assertTrue(messages[0]['content'].endswith('\n\nBusiness: Acme'))
@@ -2,11 +2,13 @@ from django.urls import path
 from .views import (
     ConversationListCreateView,
     ConversationDetailView,
-    ChatView
+    ChatView,
+    ChatStreamView
 )
 
 urlpatterns = [
     path('conversations/', ConversationListCreateView.as_view(), name='conversation-list'),
     path('conversations/<int:pk>/', ConversationDetailView.as_view(), name='conversation-detail'),
     path('chat/', ChatView.as_view(), name='chat'),
+    path('chat/stream/', ChatStreamView.as_view(), name='chat-stream'),
 ]
@@ -2,6 +2,11 @@ from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.views import APIView
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Count, OuterRef, Subquery, prefetch_related_objects
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from .models import Conversation, Message
 from .serializers import (
@@ -10,7 +15,8 @@ from .serializers import (
     MessageSerializer,
     ChatRequestSerializer
 )
-from .services import HuggingFaceService
+from .services import HuggingFaceService, MAX_HISTORY_TURNS
+import json
 
 
 class ConversationPagination(PageNumberPagination):
@@ -36,7 +42,19 @@ class ConversationListCreateView(generics.ListCreateAPIView):
         return ConversationSerializer
     
     def get_queryset(self):
-        return Conversation.objects.filter(user=self.request.user).order_by('-updated_at')
+        # Annotate message_count and the columns of each conversation's newest
+        # message (for last_message) so listing is a single query with no
+        # Message instances built per row
+        last_message = Message.objects.filter(
+            conversation=OuterRef('pk')
+        ).order_by('-created_at', '-id')
+        return Conversation.objects.filter(user=self.request.user).order_by('-updated_at').annotate(
+            message_count=Count('messages'),
+            last_message_id=Subquery(last_message.values('id')[:1]),
+            last_message_role=Subquery(last_message.values('role')[:1]),
+            last_message_content=Subquery(last_message.values('content')[:1]),
+            last_message_created_at=Subquery(last_message.values('created_at')[:1]),
+        )
     
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -50,98 +68,176 @@ class ConversationDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ConversationSerializer
     
     def get_queryset(self):
-        return Conversation.objects.filter(user=self.request.user)
+        return Conversation.objects.filter(user=self.request.user).annotate(message_count=Count('messages'))
 
 
-class ChatView(generics.GenericAPIView):
+class ChatTurnMixin:
     """
-    API endpoint for chat interactions with Humanoid AI.
+    Shared request handling for the blocking and streaming chat endpoints.
     """
     permission_classes = (IsAuthenticated,)
-    serializer_class = ChatRequestSerializer
     
-    def post(self, request):
-        serializer = self.get_serializer(data=request.data)
+    def start_turn(self, request):
+        """
+        Validate the request, get the conversation and load its history.
+        
+        Nothing is saved yet: a new conversation and the user message are
+        built in memory and only written by finish_turn, together with the
+        AI response, so a failed turn leaves nothing to clean up.
+        
+        Returns:
+            Tuple of (validated_data, conversation, user_msg, conversation_history)
+        """
+        serializer = ChatRequestSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
         conversation_id = serializer.validated_data.get('conversation_id')
         user_message = serializer.validated_data['message']
         title = serializer.validated_data.get('title', '')
-        deep_dive = serializer.validated_data.get('deep_dive', False)
         
-        # Get or create conversation
+        # Get conversation, or start a new one
         if conversation_id:
             conversation = get_object_or_404(
                 Conversation,
                 id=conversation_id,
                 user=request.user
             )
+            
+            # Get conversation history: the latest MAX_HISTORY_TURNS
+            # user/assistant turns, oldest first, read straight into
+            # role/content dicts without building Message instances
+            history_messages = conversation.messages.order_by(
+                '-created_at', '-id'
+            ).values('role', 'content')[:MAX_HISTORY_TURNS * 2]
+            conversation_history = list(history_messages)[::-1]
         else:
-            # Create new conversation
-            conversation = Conversation.objects.create(
+            conversation = Conversation(
                 user=request.user,
                 title=title or user_message[:50]
             )
+            conversation_history = []
         
-        # Save user message
-        user_msg = Message.objects.create(
-            conversation=conversation,
-            role='user',
-            content=user_message
-        )
+        user_msg = Message(role='user', content=user_message)
+        
+        return serializer.validated_data, conversation, user_msg, conversation_history
+    
+    def finish_turn(self, conversation, user_msg, ai_response, hf_service):
+        """Save the turn (conversation if new, user message and AI response) and build the response payload."""
+        ai_msg = Message(role='assistant', content=ai_response)
+        with transaction.atomic():
+            if conversation.pk is None:
+                conversation.save()
+            user_msg.conversation = conversation
+            ai_msg.conversation = conversation
+            if connection.features.can_return_rows_from_bulk_insert:
+                Message.objects.bulk_create([user_msg, ai_msg])
+            else:
+                # MySQL does not return the ids of bulk-inserted rows
+                user_msg.save()
+                ai_msg.save()
+        
+        # Load the messages once for the expanded conversation and count them
+        # from the same list instead of a separate COUNT query
+        prefetch_related_objects([conversation], 'messages')
+        conversation.message_count = len(conversation.messages.all())
+        
+        # Prepare response data (both messages rendered by one serializer)
+        user_message_data, ai_response_data = MessageSerializer([user_msg, ai_msg], many=True).data
+        response_data = {
+            'conversation_id': conversation.id,
+            'user_message': user_message_data,
+            'ai_response': ai_response_data,
+            'conversation': ConversationSerializer(conversation, context={'expand_messages': True}).data
+        }
+        
+        # Include relevant products with images if found
+        if hf_service.relevant_products:
+            response_data['relevant_products'] = hf_service.relevant_products
+        
+        return response_data
+    
+    def abort_turn(self, error):
+        """
+        Return the user-facing error message for a failed turn (nothing was saved).
+        """
+        # Use the error message from the service (already masked)
+        # or fallback to generic message
+        return str(error) if str(error) else "Something went wrong! Try Again! Send another message!"
+
+
+class ChatView(ChatTurnMixin, APIView):
+    """
+    API endpoint for chat interactions with Humanoid AI.
+    """
+    
+    def post(self, request):
+        validated_data, conversation, user_msg, conversation_history = self.start_turn(request)
         
         try:
-            # Get conversation history (exclude current user message, get last 10 for context)
-            # We exclude the current message we just created
-            history_messages = conversation.messages.exclude(id=user_msg.id).order_by('created_at')[:10]
-            conversation_history = [
-                {
-                    'role': msg.role,
-                    'content': msg.content
-                }
-                for msg in history_messages
-            ]
-            
             # Generate AI response with user's assigned HF token
             hf_service = HuggingFaceService(user=request.user)
             ai_response = hf_service.generate_response(
-                user_message=user_message,
+                user_message=validated_data['message'],
                 conversation_history=conversation_history,
-                deep_dive=deep_dive
-            )
-            
-            # Save AI response
-            ai_msg = Message.objects.create(
-                conversation=conversation,
-                role='assistant',
-                content=ai_response
+                deep_dive=validated_data.get('deep_dive', False)
             )
             
-            # Prepare response data
-            response_data = {
-                'conversation_id': conversation.id,
-                'user_message': MessageSerializer(user_msg).data,
-                'ai_response': MessageSerializer(ai_msg).data,
-                'conversation': ConversationSerializer(conversation).data
-            }
-            
-            # Include relevant products with images if found
-            if hf_service.relevant_products:
-                response_data['relevant_products'] = hf_service.relevant_products
-            
+            response_data = self.finish_turn(conversation, user_msg, ai_response, hf_service)
             return Response(response_data, status=status.HTTP_200_OK)
             
         except Exception as e:
-            # Delete the user message if AI response fails
-            user_msg.delete()
-            if not conversation_id:
-                conversation.delete()
-            
-            # Use the error message from the service (already masked)
-            # or fallback to generic message
-            error_message = str(e) if str(e) else "Something went wrong! Try Again! Send another message!"
+            error_message = self.abort_turn(e)
             
             return Response({
                 'error': error_message,
                 'message': error_message
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _sse_event(event: str, data) -> str:
+    """Format one Server-Sent Events message with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+class ChatStreamView(ChatTurnMixin, APIView):
+    """
+    API endpoint for chat interactions that streams the AI response as
+    Server-Sent Events.
+    
+    Events:
+        token: {"content": "..."} for each piece of the response as it is generated
+        done:  the same payload ChatView returns, once the response is saved
+        error: {"error": "...", "message": "..."} if generation fails
+    """
+    
+    def post(self, request):
+        validated_data, conversation, user_msg, conversation_history = self.start_turn(request)
+        
+        def event_stream():
+            chunks = []
+            try:
+                # Generate AI response with user's assigned HF token
+                hf_service = HuggingFaceService(user=request.user)
+                for chunk in hf_service.generate_response_stream(
+                    user_message=validated_data['message'],
+                    conversation_history=conversation_history,
+                    deep_dive=validated_data.get('deep_dive', False)
+                ):
+                    chunks.append(chunk)
+                    yield _sse_event('token', {'content': chunk})
+                
+                ai_response = ''.join(chunks).strip()
+                if not ai_response:
+                    raise Exception("Something went wrong! Try Again! Send another message!")
+                
+                yield _sse_event('done', self.finish_turn(conversation, user_msg, ai_response, hf_service))
+                
+            except Exception as e:
+                error_message = self.abort_turn(e)
+                yield _sse_event('error', {'error': error_message, 'message': error_message})
+        
+        response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
@@ -0,0 +1,26 @@
+"""
+Logging handlers for the Humanoid AI backend.
+"""
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+def queued_stream_handler(stream=None):
+    """
+    Return a stream handler that never blocks the calling thread on I/O.
+
+    Records are formatted and put on an in-memory queue by a QueueHandler; a
+    background QueueListener thread writes them to the stream (stderr by default).
+
+    This is a factory (referenced with '()' in LOGGING) rather than a
+    QueueHandler subclass: on Python 3.12+ dictConfig treats QueueHandler
+    subclasses specially and expects their listener to be configured for it.
+    """
+    handler = QueueHandler(queue.SimpleQueue())
+    listener = QueueListener(handler.queue, logging.StreamHandler(stream))
+    listener.start()
+    atexit.register(listener.stop)
+    handler.listener = listener
+    return handler
@@ -0,0 +1,18 @@
+"""
+Middleware for the Humanoid AI backend.
+"""
+from django.middleware.gzip import GZipMiddleware
+
+
+class StreamingAwareGZipMiddleware(GZipMiddleware):
+    """
+    GZip middleware that leaves Server-Sent Events responses uncompressed.
+
+    Compressing an event stream lets intermediaries and browsers buffer it,
+    which would hold back streamed chat tokens until the buffer fills.
+    """
+
+    def process_response(self, request, response):
+        if response.get('Content-Type', '').startswith('text/event-stream'):
+            return response
+        return super().process_response(request, response)
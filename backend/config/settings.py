@@ -37,6 +37,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Compress responses (large conversation payloads); SSE streams are left as-is
+    'config.middleware.StreamingAwareGZipMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -70,6 +72,10 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Support both SQLite (default) and MySQL (via environment variables)
 DB_ENGINE = os.getenv('DB_ENGINE', 'django.db.backends.sqlite3')
 
+# Keep database connections open between requests instead of reconnecting
+# on every request (0 = close after each request, None = unlimited)
+DB_CONN_MAX_AGE = int(os.getenv('DJANGO_MAX_CONN_AGE', '60'))
+
 if DB_ENGINE == 'django.db.backends.mysql':
     DATABASES = {
         'default': {
@@ -79,6 +85,8 @@ if DB_ENGINE == 'django.db.backends.mysql':
             'PASSWORD': os.getenv('DB_PASSWORD', 'admin123'),
             'HOST': os.getenv('DB_HOST', 'localhost'),
             'PORT': os.getenv('DB_PORT', '3306'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
             'OPTIONS': {
                 'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
                 'charset': 'utf8mb4',
@@ -90,9 +98,25 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
         }
     }
 
+# Cache
+# Holds the per-user HuggingFace token, serialized chat products and exact-repeat
+# semantic cache entries. The default local-memory cache is per process: with
+# several worker processes, a cache invalidation (accounts.signals) only reaches
+# the process that made the change, and others serve stale entries until they
+# expire. Point it at a shared store when running more than one worker, e.g.
+# DJANGO_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache with
+# DJANGO_CACHE_LOCATION=redis://127.0.0.1:6379 (needs `pip install redis`).
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', ''),
+    }
+}
+
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.User'
 
@@ -125,6 +149,35 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Logging
+# Application loggers write through a queue so request threads never block on stderr
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'verbose': {
+            'format': '{asctime} {levelname} {name}: {message}',
+            'style': '{',
+        },
+    },
+    'handlers': {
+        'queued_console': {
+            '()': 'config.log_handlers.queued_stream_handler',
+            'formatter': 'verbose',
+        },
+    },
+    'loggers': {
+        'accounts': {
+            'handlers': ['queued_console'],
+            'level': os.getenv('APP_LOG_LEVEL', 'INFO'),
+        },
+        'chat': {
+            'handlers': ['queued_console'],
+            'level': os.getenv('APP_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
@@ -171,3 +224,47 @@ CORS_ALLOW_CREDENTIALS = True
 # Hugging Face settings
 HUGGINGFACE_API_TOKEN = os.getenv('HUGGINGFACE_API_TOKEN')
 HUGGINGFACE_MODEL = os.getenv('HUGGINGFACE_MODEL', 'Qwen/Qwen3-235B-A22B')
+# Send retrieved business/product context as a system message after the conversation
+# history, keeping the prompt prefix stable for the provider's KV cache. Needs a chat
+# template that accepts system messages after the first one (Qwen3 does; e.g. Mistral and
+# Gemma templates reject them); set False to merge the context into the leading system message
+HUGGINGFACE_LATE_SYSTEM_MESSAGE = os.getenv('HUGGINGFACE_LATE_SYSTEM_MESSAGE', 'True') == 'True'
+# Context window (in tokens) of HUGGINGFACE_MODEL; conversation history is trimmed to fit
+HUGGINGFACE_CONTEXT_WINDOW = int(os.getenv('HUGGINGFACE_CONTEXT_WINDOW', '32768'))
+# Whether HUGGINGFACE_MODEL thinks before answering (e.g. Qwen3); its reasoning counts
+# toward max_tokens, so replies are never given the low "brief answer" cap
+HUGGINGFACE_REASONING_MODEL = os.getenv('HUGGINGFACE_REASONING_MODEL', 'True') == 'True'
+# Mark the system prompt with cache_control so providers that support prompt caching
+# reuse its prefill across requests. This sends the system prompt as a list of content
+# blocks: leave it off for providers that reject them, and for models whose chat template
+# only renders string content. The Qwen3 template (the default model) renders list content
+# as an empty string, which silently drops the system prompt.
+HUGGINGFACE_PROMPT_CACHE_CONTROL = os.getenv('HUGGINGFACE_PROMPT_CACHE_CONTROL', 'False') == 'True'
+# Threads per process for the business context search that runs alongside each chat
+# request; keep it at least the number of request threads per worker process
+CHAT_CONTEXT_SEARCH_WORKERS = int(os.getenv('CHAT_CONTEXT_SEARCH_WORKERS', '32'))
+# Reuse responses for near-identical messages asked with the same context (chat/semantic_cache.py)
+CHAT_SEMANTIC_CACHE = os.getenv('CHAT_SEMANTIC_CACHE', 'False') == 'True'
+# Seconds a cached response stays valid (default: 7 days)
+CHAT_SEMANTIC_CACHE_TTL = int(os.getenv('CHAT_SEMANTIC_CACHE_TTL', str(7 * 24 * 60 * 60)))
+
+# Embedding model settings (ChromaDB semantic search)
+# 'torch' runs sentence-transformers; 'onnx' runs an ONNX Runtime export of the
+# same model (faster on CPU, needs `pip install optimum[onnxruntime]`)
+EMBEDDING_BACKEND = os.getenv('EMBED_BACKEND', 'torch')
+# Device for the sentence-transformer model ('cuda', 'cpu', ...); empty = auto-detect
+EMBEDDING_DEVICE = os.getenv('EMBED_DEVICE', '')
+# Run the model in FP16 on CUDA (faster; shifts similarity scores very slightly)
+EMBEDDING_FP16 = os.getenv('EMBED_FP16', 'True') == 'True'
+# Quantize the model's Linear layers to INT8 when running on CPU (torch backend only;
+# faster and smaller, shifts similarity scores very slightly)
+EMBEDDING_QUANTIZE = os.getenv('EMBED_QUANTIZE', 'False') == 'True'
+# Maximum tokens per text fed to the embedding model; longer texts are truncated
+EMBEDDING_MAX_SEQ_LENGTH = int(os.getenv('EMBED_MAX_SEQ_LENGTH', '256'))
+
+# ChromaDB settings
+# 'embedded' keeps a local PersistentClient store in BASE_DIR/chroma_data (development);
+# 'server' connects to a standalone Chroma server so workers do not contend on one local store
+CHROMA_MODE = os.getenv('CHROMA_MODE', 'embedded')
+CHROMA_HOST = os.getenv('CHROMA_HOST', 'localhost')
+CHROMA_PORT = int(os.getenv('CHROMA_PORT', '8000'))
@@ -0,0 +1,28 @@
+import io
+import logging
+import logging.config
+import time
+from logging.handlers import QueueHandler
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+
+class LoggingConfigTests(SimpleTestCase):
+    """The LOGGING setting must load with dictConfig on every supported Python."""
+
+    def test_dict_config_loads_and_writes_through_queue(self):
+        logging.config.dictConfig(settings.LOGGING)
+
+        handler = logging.getLogger('chat').handlers[0]
+        self.assertIsInstance(handler, QueueHandler)
+
+        stream = io.StringIO()
+        handler.listener.handlers[0].setStream(stream)
+        logging.getLogger('chat.tests').warning('queued %s', 'message')
+
+        # The listener thread writes asynchronously
+        deadline = time.monotonic() + 2
+        while 'queued message' not in stream.getvalue() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertIn('WARNING chat.tests: queued message', stream.getvalue())
@@ -16,7 +16,7 @@ interface ChatAreaProps {
 
 const ChatArea = ({ isSidebarOpen, onToggleSidebar }: ChatAreaProps) => {
   const { user } = useAuthStore();
-  const { currentConversation, relevantProducts, sendMessage, isSending, error } = useChatStore();
+  const { currentConversation, relevantProducts, sendMessage, isSending, streamingResponse, error } = useChatStore();
   const [input, setInput] = useState('');
   const [deepDive, setDeepDive] = useState(false);
   const [isBusinessModalOpen, setIsBusinessModalOpen] = useState(false);
@@ -29,7 +29,7 @@ const ChatArea = ({ isSidebarOpen, onToggleSidebar }: ChatAreaProps) => {
 
   useEffect(() => {
     scrollToBottom();
-  }, [currentConversation?.messages]);
+  }, [currentConversation?.messages, streamingResponse]);
 
   useEffect(() => {
     if (textareaRef.current) {
@@ -180,8 +180,14 @@ const ChatArea = ({ isSidebarOpen, onToggleSidebar }: ChatAreaProps) => {
                 <div className="message-content">
                   <div className="message-role">Humanoid AI</div>
                   <div className="message-text">
-                    <Loader2 className="spinner" size={20} />
-                    <span>Thinking...</span>
+                    {streamingResponse ? (
+                      <ReactMarkdown>{streamingResponse}</ReactMarkdown>
+                    ) : (
+                      <>
+                        <Loader2 className="spinner" size={20} />
+                        <span>Thinking...</span>
+                      </>
+                    )}
                   </div>
                 </div>
               </div>
@@ -151,7 +151,9 @@ class ApiService {
   }
 
   async getConversation(id: number): Promise<Conversation> {
-    const response = await this.api.get<Conversation>(`/chat/conversations/${id}/`);
+    const response = await this.api.get<Conversation>(`/chat/conversations/${id}/`, {
+      params: { expand: 'messages' }
+    });
     return response.data;
   }
 
@@ -164,6 +166,62 @@ class ApiService {
     return response.data;
   }
 
+  /**
+   * Send a message and stream the AI response as it is generated (Server-Sent Events).
+   * onToken receives each piece of the response; resolves with the same payload as
+   * sendMessage once the response has been saved. Errors are thrown in the same
+   * shape as axios errors ({ response: { status, data } }).
+   */
+  async streamMessage(data: ChatRequest, onToken: (content: string) => void): Promise<ChatResponse> {
+    const post = () =>
+      fetch(`${API_BASE_URL}/chat/chat/stream/`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        credentials: 'include',
+        body: JSON.stringify(data),
+      });
+
+    let response = await post();
+    if (response.status === 401) {
+      // fetch bypasses the axios interceptor, so refresh the access token here
+      await axios.post(`${API_BASE_URL}/auth/token/refresh/`, {}, { withCredentials: true });
+      response = await post();
+    }
+    if (!response.ok || !response.body) {
+      const body = await response.json().catch(() => ({}));
+      throw { response: { status: response.status, data: body } };
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      // Events are separated by a blank line
+      let boundary: number;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const rawEvent = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+
+        let event = 'message';
+        let payload = '';
+        for (const line of rawEvent.split('\n')) {
+          if (line.startsWith('event: ')) event = line.slice(7);
+          else if (line.startsWith('data: ')) payload += line.slice(6);
+        }
+        const parsed = payload ? JSON.parse(payload) : {};
+
+        if (event === 'token') onToken(parsed.content);
+        else if (event === 'done') return parsed as ChatResponse;
+        else if (event === 'error') throw { response: { status: response.status, data: parsed } };
+      }
+    }
+    throw { response: { status: response.status, data: { error: 'Connection closed before the response completed' } } };
+  }
+
   // HuggingFace Token Management endpoints
   async getHFTokens(): Promise<HuggingFaceToken[]> {
     const response = await this.api.get<any>('/auth/hf-tokens/');
@@ -8,6 +8,7 @@ interface ChatState {
   relevantProducts: Product[];
   isLoading: boolean;
   isSending: boolean;
+  streamingResponse: string | null;
   error: string | null;
   currentPage: number;
   hasMore: boolean;
@@ -27,6 +28,7 @@ export const useChatStore = create<ChatState>((set, get) => ({
   relevantProducts: [],
   isLoading: false,
   isSending: false,
+  streamingResponse: null,
   error: null,
   currentPage: 1,
   hasMore: true,
@@ -89,27 +91,49 @@ export const useChatStore = create<ChatState>((set, get) => ({
   },
 
   sendMessage: async (message, conversationId, deepDive = false) => {
-    set({ isSending: true, error: null });
+    // Show the user's message right away; the saved conversation replaces it
+    // once the streamed response completes
+    const previousConversation = get().currentConversation;
+    const now = new Date().toISOString();
+    const pendingConversation: Conversation = {
+      id: previousConversation?.id ?? 0,
+      title: previousConversation?.title ?? message.slice(0, 50),
+      created_at: previousConversation?.created_at ?? now,
+      updated_at: now,
+      message_count: (previousConversation?.message_count ?? 0) + 1,
+      messages: [
+        ...(previousConversation?.messages ?? []),
+        { id: -1, role: 'user', content: message, created_at: now },
+      ],
+    };
+    set({ currentConversation: pendingConversation, isSending: true, streamingResponse: null, error: null });
+
     try {
-      const response = await apiService.sendMessage({
-        message,
-        conversation_id: conversationId,
-        title: conversationId ? undefined : message.slice(0, 50),
-        deep_dive: deepDive,
-      });
+      const response = await apiService.streamMessage(
+        {
+          message,
+          conversation_id: conversationId,
+          title: conversationId ? undefined : message.slice(0, 50),
+          deep_dive: deepDive,
+        },
+        (content) => set({ streamingResponse: (get().streamingResponse ?? '') + content })
+      );
 
       set({
         currentConversation: response.conversation,
         relevantProducts: response.relevant_products || [],
         isSending: false,
+        streamingResponse: null,
       });
 
       // Reload conversations list
       get().loadConversations();
     } catch (error: any) {
       set({
+        currentConversation: previousConversation,
         error: error.response?.data?.error || 'Failed to send message',
         isSending: false,
+        streamingResponse: null,
       });
       throw error;
     }